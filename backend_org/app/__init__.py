@@ -5,6 +5,9 @@ import os
 from app.config.config import Config
 from app.extensions import init_extensions
 from app.routes import register_routes
+from app.migrations import register_migration_commands
+from app.services.job_queue import register_job_commands
+from app.services.metrics import init_metrics
 
 from pathlib import Path
 env_path = Path(__file__).resolve().parent.parent / ".env"
@@ -41,10 +44,16 @@ def create_app():
     app.config["PDF_DIR"] = pdf_dir
     print("CLIENT ID AT RUNTIME =", app.config["GOOGLE_OAUTH_CLIENT_ID"])
 
+    # Request timing for /metrics (before extensions, so every route is covered)
+    init_metrics(app)
+
     # Initialize extensions
     init_extensions(app)
 
     # Register routes (NO prefixes)
     register_routes(app)
 
+    register_migration_commands(app)
+    register_job_commands(app)
+
     return app
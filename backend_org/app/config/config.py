@@ -30,6 +30,31 @@ class Config:
     GOOGLE_OAUTH_CLIENT_SECRET = None
     # Gemini
     GEMINI_API_KEY = os.getenv("my_api_key")
+    # LLM provider ("gemini" or the local "stub" used for load tests)
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+    LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))  # seconds per attempt
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))
+    LLM_STUB_FIRST_CHUNK_DELAY = float(os.getenv("LLM_STUB_FIRST_CHUNK_DELAY", "0"))
+    LLM_STUB_CHUNK_DELAY = float(os.getenv("LLM_STUB_CHUNK_DELAY", "0"))
+    # Reply cache for repeated questions (RESPONSE_CACHE_SHARED adds a Mongo tier)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "86400"))  # seconds
+    # Reworded-question matching is off by default: a one-word change can be a different legal question
+    RESPONSE_CACHE_NEAR_DUPLICATES = os.getenv("RESPONSE_CACHE_NEAR_DUPLICATES") == "1"
+    RESPONSE_CACHE_NEAR_THRESHOLD = float(os.getenv("RESPONSE_CACHE_NEAR_THRESHOLD", "0.9"))
+    RESPONSE_CACHE_SHARED = os.getenv("RESPONSE_CACHE_SHARED") == "1"
+    # Insert the user message concurrently with the model call
+    CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND") == "1"
+    CHAT_WRITE_BEHIND_WORKERS = int(os.getenv("CHAT_WRITE_BEHIND_WORKERS", "4"))
+    # Conversation context sent with each chat turn
+    CONTEXT_MAX_MESSAGES = int(os.getenv("CONTEXT_MAX_MESSAGES", "8"))  # kept verbatim
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+    CONTEXT_SUMMARY_STRIDE = int(os.getenv("CONTEXT_SUMMARY_STRIDE", "6"))
+    CONTEXT_SUMMARY_MAX_TOKENS = int(os.getenv("CONTEXT_SUMMARY_MAX_TOKENS", "300"))
     SESSION_COOKIE_SAMESITE = os.getenv("SESSION_COOKIE_SAMESITE", "Lax")
     SESSION_COOKIE_SECURE = False
     SESSION_TYPE = "filesystem"
@@ -37,6 +62,58 @@ class Config:
 
     # Mongo
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/contracts_db")
+    # Apply pending index/schema migrations at boot (or run `flask --app run migrate`)
+    MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
+    # Push notifications: "local" (single worker) or "mongo" (change streams, replica set)
+    EVENT_BUS_BACKEND = os.getenv("EVENT_BUS_BACKEND", "local")
+    EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_MAX_STREAM_SECONDS = int(os.getenv("EVENTS_MAX_STREAM_SECONDS", "300"))
+    # Rendered PDFs cached under PDF_DIR
+    PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    # Background PDF pre-rendering when a document is completed or edited
+    PDF_PRERENDER_ENABLED = os.getenv("PDF_PRERENDER_ENABLED", "1") == "1"
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", "100"))
+    PDF_RENDER_WAIT_SECONDS = float(os.getenv("PDF_RENDER_WAIT_SECONDS", "10"))
+    # Bulk ZIP export
+    EXPORT_MAX_DOCUMENTS = int(os.getenv("EXPORT_MAX_DOCUMENTS", "1000"))
+    EXPORT_RENDER_WORKERS = int(os.getenv("EXPORT_RENDER_WORKERS", "4"))
+    # Document templates: <type>@<version>.txt plus partials/ (defaults to app/document_templates)
+    DOCUMENT_TEMPLATE_DIR = os.getenv("DOCUMENT_TEMPLATE_DIR")
+    # Batch generation
+    BATCH_GENERATE_MAX_ROWS = int(os.getenv("BATCH_GENERATE_MAX_ROWS", "10000"))
+    BATCH_INSERT_SIZE = int(os.getenv("BATCH_INSERT_SIZE", "500"))
+    # Background jobs: "local" (in-process threads) or "mongo" (shared queue; run `flask jobs-worker`)
+    JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "local")
+    # Local jobs live in one worker's memory: /jobs/<id> 404s on other workers and
+    # restarts drop them, so without the mongo backend generation runs inline
+    JOB_QUEUE_ENABLED = os.getenv("JOB_QUEUE_ENABLED", "1" if JOB_QUEUE_BACKEND == "mongo" else "0") == "1"
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # in-process worker threads; 0 with dedicated workers
+    JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "60"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2"))
+    JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "60"))
+    # Avatars: square WebP variants (needs Pillow), served with immutable caching
+    AVATAR_SIZES = tuple(int(s) for s in os.getenv("AVATAR_SIZES", "64,128,256").split(","))
+    AVATAR_DEFAULT_SIZE = int(os.getenv("AVATAR_DEFAULT_SIZE", "128"))
+    AVATAR_CACHE_MAX_AGE = int(os.getenv("AVATAR_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+    # Per-process cache of user profiles for /api/me and /getProfile. Other workers'
+    # writes show up after USER_CACHE_TTL, or at once with "mongo" (change stream, replica set)
+    USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+    USER_CACHE_INVALIDATION = os.getenv("USER_CACHE_INVALIDATION", "local")
+    # Password hashing runs on its own process pool; keep workers below the core count.
+    # Changing the method rehashes each password on its next successful login.
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    # Prometheus /metrics (per process). Scrapers need Authorization: Bearer <METRICS_TOKEN>
+    # or a remote address in METRICS_ALLOWED_IPS; with neither set the endpoint is closed.
+    # Behind a reverse proxy every request shares the proxy's address, so prefer the token
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    METRICS_ALLOWED_IPS = tuple(ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "").split(",") if ip.strip())
     # Uploads
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5 MB
     UPLOAD_FOLDER = "uploads"
@@ -7,9 +7,8 @@ from flask_jwt_extended import (
 )
 from urllib.parse import urlencode
 from flask_dance.contrib.google import google
-from app.extensions import get_users_collection
-from bson import ObjectId
-from werkzeug.security import check_password_hash
+from app.utils.conditional import conditional, current_watermark
+from app.services.profile_service import get_user_profile
 
 from app.services.auth_service import (
     create_user,
@@ -17,6 +16,14 @@ from app.services.auth_service import (
     get_user_by_id,
     get_or_create_google_user,
 )
+from app.services.password_hasher import HasherBusy
+
+
+def _hasher_busy():
+    # Shed load instead of queueing logins until clients time out
+    response = jsonify({"error": "Too many sign-in attempts right now, please retry"})
+    response.headers["Retry-After"] = "2"
+    return response, 503
 
 
 # ---------- SIGNUP ----------
@@ -30,7 +37,10 @@ def signup():
         if not username or not email or not password:
             return jsonify({"error": "All fields are required"}), 400
 
-        user_id, error = create_user(username, email, password)
+        try:
+            user_id, error = create_user(username, email, password)
+        except HasherBusy:
+            return _hasher_busy()
         if error:
             return jsonify({"error": error}), 400
 
@@ -96,10 +106,14 @@ def login():
     data = request.json
     email = data.get("email")
     password = data.get("password")
-    users_collection = get_users_collection()
+    if not email or not password:
+        return jsonify({"error": "Invalid credentials"}), 401
 
-    user = users_collection.find_one({"email": email})
-    if not user or not check_password_hash(user["password"], password):
+    try:
+        user, error = authenticate_user(email, password)
+    except HasherBusy:
+        return _hasher_busy()
+    if error:
         return jsonify({"error": "Invalid credentials"}), 401
 
     token = create_access_token(identity=str(user["_id"]))
@@ -150,14 +164,12 @@ def google_authorized():
 
 # ---------- API /me ----------
 @jwt_required()
+@conditional("profile")
 def api_me():
-    users_collection = get_users_collection()
     user_id = get_jwt_identity()
 
-    user = users_collection.find_one(
-        {"_id": ObjectId(user_id)},
-        {"password": 0}  # exclude password if exists
-    )
+    # Cached per process under the watermark behind the ETag; no password
+    user = get_user_profile(user_id, version=current_watermark("profile"))
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -1,17 +1,29 @@
-from flask import request, jsonify
+import json
+
+from flask import request, jsonify, Response, stream_with_context, current_app
 from bson import ObjectId
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+from app.utils.sse import format_sse
+from app.utils.conditional import conditional
+from app.utils.cursor import decode_cursor
 from app.services.chat_service import (
     create_chat_session,
     save_chat_message,
+    begin_chat_turn,
+    complete_chat_turn,
     generate_ai_reply,
+    stream_ai_reply,
     get_user_chats,
     get_chat_messages,
+    welcome_message,
+    search_chat_messages,
     delete_chat_session,
-    touch_chat_session,
 )
 
+MAX_MESSAGES_PAGE = 200
+MAX_SEARCH_PAGE = 100
+
 
 # ---------- START CHAT ----------
 @jwt_required()
@@ -43,25 +55,65 @@ def chat():
     except Exception:
         return jsonify({"error": "Invalid session id"}), 400
 
-    # 1️⃣ Save user message
-    save_chat_message(session_oid, user_id, "user", user_message)
+    # 1️⃣ Start the turn (user message may be written behind the model call)
+    turn = begin_chat_turn(session_oid, user_id, user_message)
 
     # 2️⃣ Generate AI reply
     try:
-        bot_reply = generate_ai_reply(user_message)
+        bot_reply = generate_ai_reply(user_message, session_oid)
     except Exception as e:
         print("🔥 CHAT ERROR:", e)
         bot_reply = "Error: Unable to generate response"
 
-    # 3️⃣ Save bot message
-    save_chat_message(session_oid, user_id, "assistant", bot_reply)
-
-    # 4️⃣ Update chat updatedAt
-    touch_chat_session(session_oid)
+    # 3️⃣ Save both messages and touch the session in one batch
+    complete_chat_turn(turn, bot_reply)
 
     return jsonify({"reply": bot_reply})
 
 
+# ---------- CHAT (STREAMING) ----------
+@jwt_required()
+def chat_stream():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    user_message = data.get("message")
+    session_id = data.get("session_id")
+
+    if not user_message or not session_id:
+        return jsonify({"error": "Missing fields"}), 400
+
+    try:
+        session_oid = ObjectId(session_id)
+    except Exception:
+        return jsonify({"error": "Invalid session id"}), 400
+
+    turn = begin_chat_turn(session_oid, user_id, user_message)
+
+    def generate():
+        parts = []
+        failed = False
+        try:
+            for text in stream_ai_reply(user_message, session_oid):
+                parts.append(text)
+                yield format_sse("chunk", {"text": text})
+        except Exception:
+            current_app.logger.exception("Chat stream error")
+            failed = True
+        finally:
+            # Runs on client disconnect too, so a partial reply is never lost
+            bot_reply = "".join(parts).strip() or "Error: Unable to generate response"
+            complete_chat_turn(turn, bot_reply)
+
+        yield format_sse("error" if failed else "done", {"reply": bot_reply})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ---------- SAVE MESSAGE ----------
 @jwt_required()
 def save_message():
@@ -80,14 +132,15 @@ def save_message():
     except Exception:
         return jsonify({"error": "Invalid session id"}), 400
 
+    # save_chat_message already bumps the session's updatedAt
     save_chat_message(session_oid, user_id, sender, message)
-    touch_chat_session(session_oid)
 
     return jsonify({"success": True})
 
 
 # ---------- CHAT HISTORY ----------
 @jwt_required()
+@conditional("chats")
 def chat_history():
     user_id = get_jwt_identity()
 
@@ -101,6 +154,7 @@ def chat_history():
 
 # ---------- GET MESSAGES ----------
 @jwt_required()
+@conditional("chats")
 def get_messages(session_id):
     user_id = get_jwt_identity()
 
@@ -109,8 +163,59 @@ def get_messages(session_id):
     except Exception:
         return jsonify({"error": "Invalid session id"}), 400
 
-    messages = get_chat_messages(session_oid)
-    return jsonify({"success": True, "messages": messages})
+    limit = None
+    if request.args.get("limit"):
+        try:
+            limit = min(max(int(request.args["limit"]), 1), MAX_MESSAGES_PAGE)
+        except ValueError:
+            return jsonify({"error": "Invalid limit"}), 400
+
+    before = None
+    if request.args.get("before"):
+        try:
+            before = decode_cursor(request.args["before"])
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    messages, next_before = get_chat_messages(session_oid, before=before, limit=limit)
+
+    # Serialize message by message instead of building the whole list
+    def generate():
+        yield '{"success": true, "messages": ['
+        count = 0
+        for msg in messages:
+            yield ("," if count else "") + json.dumps(msg)
+            count += 1
+        if not count and before is None:
+            yield json.dumps(welcome_message(session_oid))
+        yield '], "next_before": ' + json.dumps(next_before) + "}"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
+
+
+# ---------- SEARCH CHATS ----------
+@jwt_required()
+def search_chats():
+    user_id = get_jwt_identity()
+
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Search query is required"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), MAX_SEARCH_PAGE)
+        page = max(int(request.args.get("page", 1)), 1)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination"}), 400
+
+    hits, has_more = search_chat_messages(user_id, q, limit=limit, skip=(page - 1) * limit)
+
+    return jsonify({
+        "success": True,
+        "results": hits,
+        "page": page,
+        "next_page": page + 1 if has_more else None,
+    })
 
 
 # ---------- DELETE CHAT ----------
@@ -1,5 +1,10 @@
+import csv
+import io
+import json
 from datetime import datetime
-from flask import request, jsonify, send_file, current_app
+from itertools import islice
+
+from flask import request, jsonify, send_file, current_app, make_response, Response, stream_with_context
 from bson import ObjectId
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
@@ -9,9 +14,37 @@ from app.services.document_service import (
     delete_document_by_id,
     update_document_fields,
     insert_document,
-    generate_document_text,
+    search_documents,
+    get_document_stats,
+    set_document_pdf_key,
+    generate_documents_batch,
+    render_document,
+)
+from app.services.template_registry import get_template_registry, TemplateValidationError
+from app.services.pdf_service import generate_pdf, render_text_pdf
+from app.services.pdf_cache import get_pdf_cache, pdf_cache_key
+from app.services.render_scheduler import schedule_pdf_render, wait_for_render
+from app.services.job_queue import enqueue_job
+from app.services.metrics import PDF_DOWNLOADS
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    find_documents_for_export,
+    stream_export_zip,
 )
-from app.services.pdf_service import generate_pdf
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.utils.conditional import conditional
+from app.utils.serializers import serialize_document
+
+MAX_PAGE_SIZE = 100
+# Page size when the client sends no limit; follow next_cursor for more
+DEFAULT_PAGE_SIZE = 50
+
+
+def _template_version(raw):
+    # None means the latest version of the type
+    if raw in (None, ""):
+        return None
+    return int(raw)
 
 
 # ---------- GENERATE DOCUMENT ----------
@@ -74,24 +107,60 @@ def generate_document():
         base_doc["status"] = "pending"
         base_doc["generatedText"] = None
 
+        try:
+            version = _template_version(data.get("templateVersion"))
+        except ValueError:
+            return jsonify({"error": "templateVersion must be an integer"}), 400
+        template = get_template_registry().get(doc_type, version)
+        if template is None:
+            return jsonify({"error": "Invalid document type"}), 400
+        try:
+            template.validate(data)
+        except TemplateValidationError as e:
+            return jsonify({"error": str(e), "fields": e.errors}), 400
+
+        # Validate before inserting so a bad request leaves no pending record
         record_id = existing_oid or insert_document({**base_doc, "createdAt": now})
 
-        document_text = generate_document_text(doc_type, data)
-        if not document_text:
-            return jsonify({"error": "Invalid document type"}), 400
+        if not current_app.config.get("JOB_QUEUE_ENABLED", False):
+            document_text, version = render_document(doc_type, data, template.version)
+            update_document_fields(record_id, {
+                "generatedText": document_text,
+                "templateVersion": version,
+                "status": "completed",
+                "updatedAt": datetime.now(),
+            })
+            schedule_pdf_render(record_id, document_text)
+
+            return jsonify({
+                "success": True,
+                "documentId": str(record_id),
+                "documentText": document_text,
+                "status": "completed",
+            }), 200
 
-        update_document_fields(record_id, {
-            "generatedText": document_text,
-            "status": "completed",
-            "updatedAt": datetime.now(),
-        })
+        if existing_oid:
+            update_document_fields(existing_oid, {"status": "pending"})
+
+        # Generation runs on a job worker; poll /jobs/<jobId> for the outcome
+        job_id = enqueue_job(
+            "generate_document",
+            {
+                "documentId": str(record_id),
+                "documentType": doc_type,
+                "fields": {name: data.get(name) for name in template.fields},
+                "templateVersion": template.version,
+            },
+            user_id=user_id,
+            doc_id=record_id,
+        )
 
         return jsonify({
             "success": True,
             "documentId": str(record_id),
-            "documentText": document_text,
-            "status": "completed",
-        }), 200
+            "jobId": str(job_id),
+            "status": "pending",
+        }), 202
 
     # ----- PAGE-BASED SAVE -----
     if current_page is not None and current_page >= 4:
@@ -109,23 +178,172 @@ def generate_document():
     return jsonify({"error": "Invalid request"}), 400
 
 
+# ---------- BATCH GENERATE ----------
+def _batch_rows():
+    """Rows from a JSON body, an uploaded CSV/JSON file, or a raw text/csv body."""
+    if request.is_json:
+        data = request.get_json() or {}
+        return data.get("documentType"), data.get("rows"), data.get("common")
+
+    doc_type = request.values.get("documentType")
+    common = json.loads(request.form["common"]) if request.form.get("common") else None
+
+    upload = request.files.get("file")
+    if upload is not None:
+        if (upload.filename or "").lower().endswith(".json"):
+            return doc_type, json.load(upload.stream), common
+        stream = upload.stream
+    elif request.mimetype == "text/csv":
+        stream = request.stream
+    else:
+        return doc_type, None, common
+
+    # DictReader streams the upload; rows are never all held in memory
+    return doc_type, csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig")), common
+
+
+@jwt_required()
+def generate_documents():
+    user_id = get_jwt_identity()
+
+    try:
+        doc_type, rows, common = _batch_rows()
+    except ValueError:
+        return jsonify({"error": "Invalid JSON input"}), 400
+
+    try:
+        version = _template_version(
+            (request.get_json(silent=True) or {}).get("templateVersion")
+            if request.is_json else request.values.get("templateVersion")
+        )
+    except ValueError:
+        return jsonify({"error": "templateVersion must be an integer"}), 400
+
+    if get_template_registry().get(doc_type, version) is None:
+        return jsonify({"error": "Invalid document type"}), 400
+    if rows is None or isinstance(rows, (str, dict)):
+        return jsonify({"error": "Provide rows as a JSON array or a CSV file"}), 400
+    if common is not None and not isinstance(common, dict):
+        return jsonify({"error": "common must be an object"}), 400
+
+    max_rows = current_app.config.get("BATCH_GENERATE_MAX_ROWS", 10000)
+    batch_size = current_app.config.get("BATCH_INSERT_SIZE", 500)
+    rows = iter(rows)
+
+    # One JSON object per line: a result per row, then a summary
+    def generate():
+        inserted = failed = 0
+        results = generate_documents_batch(
+            user_id, doc_type, islice(rows, max_rows),
+            common=common, batch_size=batch_size, version=version,
+        )
+        for result in results:
+            if "error" in result:
+                failed += 1
+            else:
+                inserted += 1
+            yield json.dumps(result) + "\n"
+
+        summary = {"done": True, "inserted": inserted, "failed": failed}
+        if next(rows, None) is not None:
+            summary["truncated"] = True
+            summary["maxRows"] = max_rows
+        yield json.dumps(summary) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 # ---------- GET ALL DOCUMENTS ----------
 @jwt_required()
+@conditional("documents")
 def get_documents():
     user_id = get_jwt_identity()
-    docs = get_documents_for_user(user_id)
 
-    for d in docs:
-        d["_id"] = str(d["_id"])
-        for k in ("createdAt", "updatedAt"):
-            if isinstance(d.get(k), datetime):
-                d[k] = d[k].isoformat()
+    try:
+        limit = min(max(int(request.args.get("limit", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "Invalid limit"}), 400
+
+    after = None
+    if request.args.get("after"):
+        try:
+            after = decode_cursor(request.args["after"])
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    include = {f.strip() for f in request.args.get("include", "").split(",") if f.strip()}
+    docs = get_documents_for_user(
+        user_id,
+        limit=limit,
+        after=after,
+        include_text="generatedText" in include,
+        summary=request.args.get("shape") == "summary",
+    )
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["updatedAt"], last["_id"])
+
+    return jsonify({
+        "success": True,
+        "documents": [serialize_document(d) for d in docs],
+        "next_cursor": next_cursor,
+    }), 200
+
+
+# ---------- DOCUMENT STATS ----------
+@jwt_required()
+@conditional("documents")
+def get_documents_stats():
+    user_id = get_jwt_identity()
+    return jsonify({"success": True, "stats": get_document_stats(user_id)}), 200
+
+
+# ---------- SEARCH DOCUMENTS ----------
+@jwt_required()
+def search_user_documents():
+    user_id = get_jwt_identity()
 
-    return jsonify({"success": True, "documents": docs}), 200
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "Search query is required"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), MAX_PAGE_SIZE)
+        page = max(int(request.args.get("page", 1)), 1)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination"}), 400
+
+    try:
+        date_from = datetime.fromisoformat(request.args["from"]) if request.args.get("from") else None
+        date_to = datetime.fromisoformat(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "Invalid date filter"}), 400
+
+    results, has_more = search_documents(
+        user_id,
+        q,
+        doc_type=request.args.get("type"),
+        status=request.args.get("status"),
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        skip=(page - 1) * limit,
+    )
+
+    return jsonify({
+        "success": True,
+        "results": [serialize_document(r) for r in results],
+        "page": page,
+        "next_page": page + 1 if has_more else None,
+    }), 200
 
 
 # ---------- GET SINGLE DOCUMENT ----------
 @jwt_required()
+@conditional("documents")
 def get_single_document(doc_id):
     user_id = get_jwt_identity()
 
@@ -141,12 +359,7 @@ def get_single_document(doc_id):
     if str(doc.get("user_id")) != str(user_id):
         return jsonify({"error": "Unauthorized"}), 403
 
-    doc["_id"] = str(doc["_id"])
-    for k in ("createdAt", "updatedAt"):
-        if isinstance(doc.get(k), datetime):
-            doc[k] = doc[k].isoformat()
-
-    return jsonify({"success": True, "document": doc}), 200
+    return jsonify({"success": True, "document": serialize_document(doc)}), 200
 
 
 # ---------- UPDATE DOCUMENT ----------
@@ -182,6 +395,9 @@ def update_document(doc_id):
     allowed["updatedAt"] = datetime.now()
     update_document_fields(oid, allowed)
 
+    if allowed.get("generatedText"):
+        schedule_pdf_render(oid, allowed["generatedText"])
+
     return jsonify({"success": True, "documentId": doc_id}), 200
 
 
@@ -205,6 +421,61 @@ def delete_document(doc_id):
     return jsonify({"success": True, "message": "Document deleted"}), 200
 
 
+# ---------- BULK EXPORT ----------
+@jwt_required()
+def export_documents():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    fmt = data.get("format", "pdf")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be pdf, txt or both"}), 400
+
+    max_docs = current_app.config.get("EXPORT_MAX_DOCUMENTS", 1000)
+    ids = None
+    if data.get("ids"):
+        if len(data["ids"]) > max_docs:
+            return jsonify({"error": f"At most {max_docs} documents per export"}), 400
+        try:
+            ids = [ObjectId(i) for i in data["ids"]]
+        except Exception:
+            return jsonify({"error": "Invalid document id"}), 400
+
+    filters = data.get("filter") or {}
+    if ids is None and not filters:
+        return jsonify({"error": "Provide ids or a filter"}), 400
+
+    try:
+        date_from = datetime.fromisoformat(filters["from"]) if filters.get("from") else None
+        date_to = datetime.fromisoformat(filters["to"]) if filters.get("to") else None
+    except ValueError:
+        return jsonify({"error": "Invalid date filter"}), 400
+
+    documents = find_documents_for_export(
+        user_id,
+        ids=ids,
+        doc_type=filters.get("type"),
+        status=filters.get("status"),
+        date_from=date_from,
+        date_to=date_to,
+        limit=max_docs,
+    )
+
+    filename = f"leximate-export-{datetime.now():%Y%m%d-%H%M%S}.zip"
+    return Response(
+        stream_with_context(stream_export_zip(
+            documents,
+            fmt=fmt,
+            workers=current_app.config.get("EXPORT_RENDER_WORKERS", 4),
+        )),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 # ---------- DOWNLOAD PDF ----------
 '''@jwt_required()
 def download_document(doc_id):
@@ -228,11 +499,6 @@ def download_document(doc_id):
 
     return send_file(pdf_path, as_attachment=True, download_name=filename)
 '''
-from flask import send_file
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-
 @jwt_required()
 def download_document(doc_id):
     user_id = get_jwt_identity()
@@ -248,23 +514,47 @@ def download_document(doc_id):
     if not text:
         return jsonify({"error": "Document not generated yet"}), 400
 
-    # ---- CREATE PDF IN MEMORY ----
-    buffer = BytesIO()
-    pdf = SimpleDocTemplate(buffer)
-    styles = getSampleStyleSheet()
-
-    content = []
-    for line in text.split("\n"):
-        content.append(Paragraph(line, styles["Normal"]))
-
-    pdf.build(content)
-    buffer.seek(0)
+    # ---- SERVE FROM THE CONTENT-ADDRESSED PDF CACHE ----
+    key = pdf_cache_key(text)
+    # This URL's PDF changes when the text is edited, so browsers revalidate
+    # every time; an unchanged document costs one lookup and a 304
+    if request.if_none_match.contains(key):
+        response = make_response("", 304)
+        response.set_etag(key)
+        _private_no_cache(response)
+        return response
+
+    cache = get_pdf_cache()
+    source = "cache"
+    path = cache.get(key)
+    if path is None:
+        # A pre-render may be running already; waiting beats rendering twice
+        source = "prerender"
+        path = wait_for_render(key, current_app.config.get("PDF_RENDER_WAIT_SECONDS", 10))
+    if path is None:
+        source = "render"
+        path = cache.put(key, lambda out: render_text_pdf(text, out))
+    PDF_DOWNLOADS.labels(source).inc()
+    if document.get("pdfCacheKey") != key:
+        set_document_pdf_key(document["_id"], key)
 
     filename = f"{document.get('type', 'document')}.pdf"
 
-    return send_file(
-        buffer,
+    response = send_file(
+        path,
         as_attachment=True,
         download_name=filename,
-        mimetype="application/pdf"
+        mimetype="application/pdf",
+        conditional=True,
+        etag=key,
     )
+    _private_no_cache(response)
+    return response
+
+
+def _private_no_cache(response):
+    # A user's private contract: never shared caches, always revalidated
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.cache_control.max_age = None
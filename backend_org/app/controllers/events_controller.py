@@ -0,0 +1,39 @@
+import time
+
+from flask import Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.services.event_bus import get_event_bus
+from app.utils.sse import format_sse, format_sse_comment
+
+
+# ---------- EVENT STREAM ----------
+# EventSource cannot set headers, so the token may also come as ?jwt=<token>
+@jwt_required(locations=["headers", "query_string"])
+def stream_events():
+    user_id = get_jwt_identity()
+    heartbeat = current_app.config.get("EVENTS_HEARTBEAT_SECONDS", 15)
+    max_age = current_app.config.get("EVENTS_MAX_STREAM_SECONDS", 300)
+
+    subscription = get_event_bus().subscribe(user_id)
+
+    def generate():
+        # Bounded lifetime: EventSource reconnects on its own, and the
+        # worker thread is released back to the pool in the meantime.
+        deadline = time.monotonic() + max_age
+        try:
+            yield "retry: 3000\n" + format_sse("ready", {"user_id": user_id})
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield format_sse_comment("keep-alive")
+                else:
+                    yield format_sse(event["type"], event)
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,23 @@
+from bson import ObjectId
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.services.job_queue import get_job
+from app.utils.serializers import serialize_job
+
+
+# ---------- JOB STATUS ----------
+@jwt_required()
+def get_job_status(job_id):
+    user_id = get_jwt_identity()
+
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        return jsonify({"error": "Invalid job id"}), 400
+
+    job = get_job(oid)
+    if not job or str(job.get("user_id")) != str(user_id):
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({"success": True, "job": serialize_job(job)}), 200
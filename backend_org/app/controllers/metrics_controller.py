@@ -0,0 +1,23 @@
+import hmac
+
+from flask import Response, current_app, request
+
+from app.services.metrics import render_metrics
+
+
+# ---------- PROMETHEUS SCRAPE ----------
+def _scrape_allowed():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if hmac.compare_digest(supplied, token):
+            return True
+    return request.remote_addr in current_app.config.get("METRICS_ALLOWED_IPS", ())
+
+
+def metrics():
+    # Closed unless METRICS_TOKEN or METRICS_ALLOWED_IPS is configured
+    if not _scrape_allowed():
+        return Response("unauthorized\n", status=401, mimetype="text/plain")
+
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -1,8 +1,4 @@
 import os
-import uuid
-from urllib.parse import quote
-from bson import ObjectId
-from datetime import datetime
 
 from flask import (
     request,
@@ -10,11 +6,22 @@ from flask import (
     current_app,
     url_for,
     send_from_directory,
+    send_file,
 )
-from werkzeug.utils import secure_filename
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app.extensions import get_users_collection
+from app.services.profile_service import get_user_profile, update_user_profile
+from app.utils.conditional import conditional, current_watermark
+from app.services.job_queue import enqueue_job
+from app.services.avatar_service import (
+    AVATAR_HASH,
+    AvatarError,
+    missing_variants,
+    pick_size,
+    resolve_avatar,
+    run_avatar_variants_job,
+    store_avatar,
+)
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp", "gif"}
 
@@ -25,14 +32,11 @@ def allowed_file(filename):
 
 # ---------- GET PROFILE ----------
 @jwt_required()
+@conditional("profile")
 def get_profile():
-    users_collection = get_users_collection()
     user_id = get_jwt_identity()
 
-    user = users_collection.find_one(
-        {"_id": ObjectId(user_id)},
-        {"password": 0}
-    )
+    user = get_user_profile(user_id, version=current_watermark("profile"))
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -47,7 +51,6 @@ def update_profile():
     if request.method == "OPTIONS":
         return ("", 200)
 
-    users_collection = get_users_collection()
     user_id = get_jwt_identity()
     data = request.get_json() or {}
 
@@ -63,23 +66,21 @@ def update_profile():
             if val is not None and not (isinstance(val, str) and val.strip() == ""):
                 update_fields[key] = val
 
-    if update_fields:
-        update_fields["updatedAt"] = datetime.now()
-        users_collection.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_fields}
-        )
-
-    user = users_collection.find_one(
-        {"_id": ObjectId(user_id)},
-        {"password": 0}
-    )
+    user = update_user_profile(user_id, update_fields)
 
     user["_id"] = str(user["_id"])
     return jsonify({"success": True, "user": user}), 200
 
 
 # ---------- UPLOAD AVATAR ----------
+def _avatar_root():
+    return os.path.join(current_app.config["UPLOAD_FOLDER"], "avatars")
+
+
+def _avatar_sizes():
+    return current_app.config.get("AVATAR_SIZES", (64, 128, 256))
+
+
 @jwt_required()
 def upload_avatar():
     user_id = get_jwt_identity()
@@ -96,29 +97,71 @@ def upload_avatar():
         if ext not in ALLOWED_EXTENSIONS:
             return jsonify(success=False, message="File type not allowed"), 400
 
-        filename = secure_filename(file.filename)
-        unique_name = f"{uuid.uuid4().hex}_{filename}"
-
-        upload_dir = current_app.config["UPLOAD_FOLDER"]
-        os.makedirs(upload_dir, exist_ok=True)
-
-        save_path = os.path.join(upload_dir, unique_name)
-        file.save(save_path)
-
-        quoted = quote(unique_name)
+        root = _avatar_root()
+        try:
+            avatar_hash, _ = store_avatar(root, file.read())
+        except AvatarError as e:
+            return jsonify(success=False, message=str(e)), 400
+
+        # Resizing happens on a job worker; until then the original is served
+        sizes = list(_avatar_sizes())
+        if missing_variants(root, avatar_hash, sizes):
+            payload = {"root": root, "hash": avatar_hash, "sizes": sizes}
+            if current_app.config.get("JOB_QUEUE_ENABLED", False):
+                enqueue_job("avatar_variants", payload, user_id=user_id)
+            else:
+                run_avatar_variants_job(payload)
+
+        default_size = current_app.config.get("AVATAR_DEFAULT_SIZE", 128)
         public_url = url_for(
-            "profile.serve_upload",
-            filename=quoted,
+            "profile.serve_avatar",
+            avatar_hash=avatar_hash,
+            size=default_size,
             _external=True,
         )
+        variants = {
+            size: url_for("profile.serve_avatar", avatar_hash=avatar_hash, size=size, _external=True)
+            for size in sizes
+        }
 
-        return jsonify(success=True, url=public_url)
+        return jsonify(success=True, url=public_url, hash=avatar_hash, variants=variants)
 
     except Exception as e:
         current_app.logger.exception("upload failed")
         return jsonify(success=False, message=str(e)), 500
 
 
+# ---------- SERVE AVATAR ----------
+def serve_avatar(avatar_hash):
+    if not AVATAR_HASH.match(avatar_hash):
+        return jsonify({"error": "Avatar not found"}), 404
+
+    try:
+        requested = int(request.args.get("size", current_app.config.get("AVATAR_DEFAULT_SIZE", 128)))
+    except ValueError:
+        return jsonify({"error": "Invalid size"}), 400
+    size = pick_size(_avatar_sizes(), requested)
+
+    found = resolve_avatar(_avatar_root(), avatar_hash, size)
+    if found is None:
+        return jsonify({"error": "Avatar not found"}), 404
+    path, mimetype, is_variant = found
+
+    # Content-addressed: a given URL's bytes never change once the variant exists
+    max_age = current_app.config.get("AVATAR_CACHE_MAX_AGE", 31536000) if is_variant else 60
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=f"{avatar_hash}-{size}" if is_variant else f"{avatar_hash}-orig",
+        max_age=max_age,
+    )
+    response.cache_control.public = True
+    if is_variant:
+        response.cache_control.immutable = True
+    return response
+
+
 # ---------- SERVE UPLOAD ----------
 def serve_upload(filename):
     return send_from_directory(
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+from flask import request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app.services.sync_service import get_changes_since, decode_sync_cursor
+from app.utils.serializers import serialize_document, serialize_chat_session
+
+MAX_SYNC_BATCH = 500
+
+
+# ---------- DELTA SYNC ----------
+@jwt_required()
+def sync_changes():
+    user_id = get_jwt_identity()
+
+    since = None
+    if request.args.get("since"):
+        try:
+            since = datetime.fromisoformat(request.args["since"])
+        except ValueError:
+            return jsonify({"error": "Invalid watermark"}), 400
+        # Watermarks are naive server time; an offset means it is not one of ours
+        if since.tzinfo is not None:
+            return jsonify({"error": "Invalid watermark"}), 400
+
+    after = None
+    if request.args.get("after"):
+        try:
+            after = decode_sync_cursor(request.args["after"])
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    include = {f.strip() for f in request.args.get("include", "").split(",") if f.strip()}
+    changes = get_changes_since(
+        user_id,
+        since=since,
+        after=after,
+        include_text="generatedText" in include,
+        limit=MAX_SYNC_BATCH,
+    )
+
+    return jsonify({
+        "success": True,
+        "reset": changes["reset"],
+        "has_more": changes["has_more"],
+        "watermark": changes["watermark"].isoformat(),
+        "cursor": changes["cursor"],
+        "documents": [serialize_document(d) for d in changes["documents"]],
+        "chat_sessions": [serialize_chat_session(c) for c in changes["chat_sessions"]],
+        "deleted": [
+            {"kind": t["kind"], "id": t["ref_id"], "deletedAt": t["deletedAt"].isoformat()}
+            for t in changes["deleted"]
+        ],
+    }), 200
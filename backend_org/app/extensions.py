@@ -5,12 +5,22 @@ from flask import redirect, current_app
 from flask_cors import CORS
 from pymongo import MongoClient
 
-import google.generativeai as genai
 from flask_dance.contrib.google import make_google_blueprint, google
 from flask_dance.consumer import oauth_authorized
 from flask_jwt_extended import JWTManager, create_access_token
 
 from app.services.auth_service import get_or_create_google_user
+from app.services.llm_service import init_llm
+from app.services.response_cache import init_response_cache
+from app.migrations import run_migrations
+from app.services.event_bus import init_event_bus
+from app.services.pdf_cache import init_pdf_cache
+from app.services.render_scheduler import init_render_scheduler
+from app.services.template_registry import init_templates
+from app.services.job_queue import init_job_queue
+from app.services.profile_service import init_user_cache
+from app.services.password_hasher import init_password_hasher
+from app.services.metrics import MongoCommandMetrics
 
 # ------------------ Globals ------------------
 client = None
@@ -56,7 +66,8 @@ def init_extensions(app):
     mongo_uri = app.config.get(
         "MONGO_URI", "mongodb://localhost:27017/contracts_db"
     )
-    client = MongoClient(mongo_uri)
+    listeners = [MongoCommandMetrics()] if app.config.get("METRICS_ENABLED", True) else []
+    client = MongoClient(mongo_uri, event_listeners=listeners)
 
     db_name = mongo_uri.rsplit("/", 1)[-1]
     db = client[db_name]
@@ -67,8 +78,37 @@ def init_extensions(app):
     chat_sessions = db["chat_sessions"]
     chat_messages = db["messages"]
 
-    # -------- Gemini --------
-    genai.configure(api_key=app.config.get("GEMINI_API_KEY"))
+    if app.config.get("MIGRATE_ON_STARTUP", True):
+        try:
+            # A failing migration (e.g. duplicate emails block the unique
+            # index) is logged and retried next start; the others still apply
+            run_migrations(db, app.logger)
+        except Exception:
+            # Could not reach the migrations collection at all
+            app.logger.exception("Database migrations failed")
+
+    # -------- Password hashing pool --------
+    init_password_hasher(app)
+
+    # -------- User/profile cache --------
+    init_user_cache(app)
+
+    # -------- Event bus (document / chat notifications) --------
+    init_event_bus(app, db)
+
+    # -------- Document templates (parsed once) --------
+    init_templates(app)
+
+    # -------- PDF cache (under PDF_DIR) --------
+    init_pdf_cache(app)
+    init_render_scheduler(app)
+
+    # -------- Background jobs (document generation) --------
+    init_job_queue(app, db)
+
+    # -------- LLM provider --------
+    init_llm(app)
+    init_response_cache(app, db)
 
     # -------- JWT --------
     jwt_manager = JWTManager(app)
@@ -0,0 +1,202 @@
+from datetime import datetime
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+
+MIGRATIONS_COLLECTION = "_migrations"
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+# ---------- MIGRATIONS ----------
+@migration(1, "users: unique email and google_id")
+def _users_identity_indexes(db):
+    users = db["users"]
+    # Partial filters: password accounts have no google_id. Equality lookups
+    # such as find_one({"google_id": ...}) still qualify for the index.
+    users.create_index(
+        [("email", ASCENDING)],
+        name="email_unique",
+        unique=True,
+        partialFilterExpression={"email": {"$exists": True}},
+    )
+    users.create_index(
+        [("google_id", ASCENDING)],
+        name="google_id_unique",
+        unique=True,
+        partialFilterExpression={"google_id": {"$exists": True}},
+    )
+
+
+@migration(2, "documents and chat sessions listed per user by recency")
+def _per_user_listing_indexes(db):
+    db["nda_agreements"].create_index(
+        [("user_id", ASCENDING), ("updatedAt", DESCENDING)],
+        name="user_updated",
+    )
+    db["chat_sessions"].create_index(
+        [("user_id", ASCENDING), ("updatedAt", DESCENDING)],
+        name="user_updated",
+    )
+
+
+@migration(3, "messages read per session in timestamp order")
+def _message_history_index(db):
+    db["messages"].create_index(
+        [("session_id", ASCENDING), ("timestamp", ASCENDING)],
+        name="session_timestamp",
+    )
+    # delete_chat_session filters on both fields
+    db["messages"].create_index(
+        [("session_id", ASCENDING), ("user_id", ASCENDING)],
+        name="session_user",
+    )
+
+
+@migration(4, "shared LLM response cache expiry and near-duplicate lookup")
+def _response_cache_indexes(db):
+    cache = db["llm_response_cache"]
+    cache.create_index("expiresAt", name="expires_ttl", expireAfterSeconds=0)
+    cache.create_index("bands", name="bands")
+
+
+@migration(5, "keyset pagination of documents by (updatedAt, _id)")
+def _document_keyset_index(db):
+    documents = db["nda_agreements"]
+    documents.create_index(
+        [("user_id", ASCENDING), ("updatedAt", DESCENDING), ("_id", DESCENDING)],
+        name="user_updated_id",
+    )
+    # Superseded: the new index serves every query the old one did
+    if "user_updated" in documents.index_information():
+        documents.drop_index("user_updated")
+
+
+@migration(6, "deletion tombstones for delta sync")
+def _tombstone_indexes(db):
+    from app.services.sync_service import TOMBSTONE_RETENTION
+
+    tombstones = db["tombstones"]
+    tombstones.create_index(
+        [("user_id", ASCENDING), ("deletedAt", ASCENDING), ("_id", ASCENDING)],
+        name="user_deleted",
+    )
+    tombstones.create_index(
+        "deletedAt",
+        name="deleted_ttl",
+        expireAfterSeconds=int(TOMBSTONE_RETENTION.total_seconds()),
+    )
+
+
+@migration(7, "keyset pagination of messages by (timestamp, _id)")
+def _message_keyset_index(db):
+    messages = db["messages"]
+    messages.create_index(
+        [("session_id", ASCENDING), ("timestamp", ASCENDING), ("_id", ASCENDING)],
+        name="session_timestamp_id",
+    )
+    if "session_timestamp" in messages.index_information():
+        messages.drop_index("session_timestamp")
+
+
+@migration(8, "full-text search over a user's documents")
+def _document_text_index(db):
+    # The user_id prefix scopes every $text query to one user's documents
+    db["nda_agreements"].create_index(
+        [
+            ("user_id", ASCENDING),
+            ("companyName", TEXT),
+            ("counterpartyName", TEXT),
+            ("purpose", TEXT),
+            ("generatedText", TEXT),
+        ],
+        name="user_text",
+        weights={"companyName": 5, "counterpartyName": 5, "purpose": 2, "generatedText": 1},
+        default_language="english",
+    )
+
+
+@migration(9, "full-text search across a user's chat messages")
+def _message_text_index(db):
+    db["messages"].create_index(
+        [("user_id", ASCENDING), ("message", TEXT)],
+        name="user_text",
+        default_language="english",
+    )
+
+
+@migration(10, "jobs: claim order, lease expiry, finished-job TTL")
+def _job_queue_indexes(db):
+    jobs = db["jobs"]
+    jobs.create_index([("status", ASCENDING), ("runAt", ASCENDING)], name="status_run_at")
+    jobs.create_index([("status", ASCENDING), ("leaseUntil", ASCENDING)], name="status_lease")
+    # Finished jobs are only kept for status polling
+    jobs.create_index(
+        [("finishedAt", ASCENDING)],
+        name="finished_ttl",
+        expireAfterSeconds=7 * 24 * 3600,
+    )
+
+
+# ---------- RUNNER ----------
+def applied_versions(db):
+    return {doc["_id"] for doc in db[MIGRATIONS_COLLECTION].find({}, {"_id": 1})}
+
+
+def run_migrations(db, logger=None):
+    """Apply pending migrations; returns (applied, failed) version lists.
+
+    Each migration is independent, so one that fails (e.g. duplicate emails
+    blocking the unique index) is logged and left pending for the next run
+    while the rest still apply.
+    """
+    done = applied_versions(db)
+    applied, failed = [], []
+
+    for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done:
+            continue
+        try:
+            fn(db)
+        except Exception:
+            failed.append(version)
+            if logger:
+                logger.exception("Migration %s failed: %s", version, description)
+            continue
+        # Index builds are idempotent, so a crash before this write simply reruns
+        db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": version},
+            {"$setOnInsert": {"description": description, "appliedAt": datetime.now()}},
+            upsert=True,
+        )
+        applied.append(version)
+        if logger:
+            logger.info("Applied migration %s: %s", version, description)
+
+    return applied, failed
+
+
+def register_migration_commands(app):
+    @app.cli.command("migrate")
+    def migrate_command():
+        """Create indexes and apply pending schema migrations."""
+        import click
+
+        import app.extensions as ext
+
+        applied, failed = run_migrations(ext.db, app.logger)
+        if applied:
+            print("Applied migrations:", ", ".join(str(v) for v in applied))
+        if failed:
+            raise click.ClickException(
+                "Failed migrations: " + ", ".join(str(v) for v in failed)
+                + " (see the errors above; they are retried on the next run)"
+            )
+        if not applied:
+            print("Database is up to date")
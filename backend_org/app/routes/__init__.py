@@ -2,9 +2,17 @@ from app.routes.auth_routes import auth_bp
 from app.routes.profile_routes import profile_bp
 from app.routes.document_routes import document_bp
 from app.routes.chat_routes import chat_bp
+from app.routes.events_routes import events_bp
+from app.routes.sync_routes import sync_bp
+from app.routes.job_routes import job_bp
+from app.routes.metrics_routes import metrics_bp
 
 def register_routes(app):
     app.register_blueprint(auth_bp)
     app.register_blueprint(profile_bp)
     app.register_blueprint(document_bp)
-    app.register_blueprint(chat_bp)
\ No newline at end of file
+    app.register_blueprint(chat_bp)
+    app.register_blueprint(events_bp)
+    app.register_blueprint(sync_bp)
+    app.register_blueprint(job_bp)
+    app.register_blueprint(metrics_bp)
@@ -2,10 +2,14 @@ from flask import Blueprint
 from app.controllers.document_controller import (
     generate_document,
     get_documents,
+    search_user_documents,
+    get_documents_stats,
     get_single_document,
     update_document,
     delete_document,
     download_document,
+    export_documents,
+    generate_documents,
 )
 
 document_bp = Blueprint("documents", __name__)
@@ -13,8 +17,12 @@ document_bp = Blueprint("documents", __name__)
 document_bp.route("/generate-document", methods=["POST"])(generate_document)
 
 document_bp.route("/documents", methods=["GET"])(get_documents)
+document_bp.route("/documents/search", methods=["GET"])(search_user_documents)
+document_bp.route("/documents/stats", methods=["GET"])(get_documents_stats)
 document_bp.route("/documents/<doc_id>", methods=["GET"])(get_single_document)
 document_bp.route("/documents/<doc_id>", methods=["PUT"])(update_document)
 document_bp.route("/documents/<doc_id>", methods=["DELETE"])(delete_document)
 
 document_bp.route("/download-document/<doc_id>", methods=["GET"])(download_document)
+document_bp.route("/documents/export", methods=["POST"])(export_documents)
+document_bp.route("/documents/batch", methods=["POST"])(generate_documents)
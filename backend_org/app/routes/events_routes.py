@@ -0,0 +1,6 @@
+from flask import Blueprint
+from app.controllers.events_controller import stream_events
+
+events_bp = Blueprint("events", __name__)
+
+events_bp.route("/events", methods=["GET"])(stream_events)
@@ -0,0 +1,6 @@
+from flask import Blueprint
+from app.controllers.job_controller import get_job_status
+
+job_bp = Blueprint("jobs", __name__)
+
+job_bp.route("/jobs/<job_id>", methods=["GET"])(get_job_status)
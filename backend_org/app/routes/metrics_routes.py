@@ -0,0 +1,6 @@
+from flask import Blueprint
+from app.controllers.metrics_controller import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+metrics_bp.route("/metrics", methods=["GET"])(metrics)
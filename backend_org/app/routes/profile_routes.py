@@ -4,6 +4,7 @@ from app.controllers.profile_controller import (
     update_profile,
     upload_avatar,
     serve_upload,
+    serve_avatar,
 )
 
 profile_bp = Blueprint("profile", __name__)
@@ -13,3 +14,4 @@ profile_bp.route("/updateProfile", methods=["PUT"])(update_profile)
 
 profile_bp.route("/uploadProfileImage", methods=["POST"])(upload_avatar)
 profile_bp.route("/uploads/<path:filename>", methods=["GET"])(serve_upload)
+profile_bp.route("/avatars/<avatar_hash>", methods=["GET"])(serve_avatar)
@@ -0,0 +1,6 @@
+from flask import Blueprint
+from app.controllers.sync_controller import sync_changes
+
+sync_bp = Blueprint("sync", __name__)
+
+sync_bp.route("/sync", methods=["GET"])(sync_changes)
@@ -1,8 +1,11 @@
 from datetime import datetime
 from bson import ObjectId
-from werkzeug.security import generate_password_hash, check_password_hash
+from pymongo.errors import DuplicateKeyError
 
 import app.extensions as ext
+from app.services.watermark_service import bump_watermark
+from app.services.profile_service import invalidate_user
+from app.services.password_hasher import get_password_hasher
 
 
 
@@ -18,7 +21,8 @@ def create_user(username, email, password):
     if users_collection.find_one({"email": email}):
         return None, "Email already registered"
 
-    hashed_password = generate_password_hash(password)
+    # May raise HasherBusy; the controller turns that into a 503
+    hashed_password = get_password_hasher().hash(password)
 
     user_doc = {
         "username": username,
@@ -27,7 +31,11 @@ def create_user(username, email, password):
         "createdAt": datetime.now(),
     }
 
-    result = users_collection.insert_one(user_doc)
+    try:
+        result = users_collection.insert_one(user_doc)
+    except DuplicateKeyError:
+        # A concurrent signup won the race past the find_one above
+        return None, "Email already registered"
     return result.inserted_id, None
 
 
@@ -41,9 +49,19 @@ def authenticate_user(email, password):
     if "password" not in user:
         return None, "Use Google login"
 
-    if not check_password_hash(user["password"], password):
+    hasher = get_password_hasher()
+    if not hasher.verify(user["password"], password):
         return None, "Incorrect password"
 
+    if hasher.needs_rehash(user["password"]):
+        # Hash parameters changed since this password was stored: upgrade it
+        # now that we have the plaintext, without delaying the response
+        old_hash = user["password"]
+        hasher.rehash_async(password, lambda new_hash: users_collection.update_one(
+            {"_id": user["_id"], "password": old_hash},
+            {"$set": {"password": new_hash}},
+        ))
+
     return user, None
 
 
@@ -68,7 +86,11 @@ def get_or_create_google_user(google_id, email, name):
             "signup_method": "google",
             "createdAt": datetime.now(),
         }
-        inserted = users_collection.insert_one(user_doc)
+        try:
+            inserted = users_collection.insert_one(user_doc)
+        except DuplicateKeyError:
+            # Concurrent first login for the same account: use the winner's record
+            return users_collection.find_one({"$or": [{"google_id": google_id}, {"email": email}]})
         return users_collection.find_one({"_id": inserted.inserted_id})
 
     if not user.get("google_id"):
@@ -76,5 +98,7 @@ def get_or_create_google_user(google_id, email, name):
             {"_id": user["_id"]},
             {"$set": {"google_id": google_id}},
         )
+        invalidate_user(user["_id"])
+        bump_watermark(user["_id"], "profile")
 
     return user
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it avatars are stored but not resized
+    Image = None
+
+from app.services.job_queue import job_handler
+
+logger = logging.getLogger(__name__)
+
+AVATAR_HASH = re.compile(r"^[0-9a-f]{64}$")
+VARIANT_FORMAT = ("WEBP", "webp", "image/webp")
+MAX_PIXELS = 40_000_000
+
+# Magic numbers, so the stored type never depends on the client's filename
+SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (b"GIF87a", "gif", "image/gif"),
+    (b"GIF89a", "gif", "image/gif"),
+)
+ORIGINAL_EXTENSIONS = ("jpg", "png", "webp", "gif")
+
+
+class AvatarError(ValueError):
+    pass
+
+
+def sniff_image_type(data):
+    for magic, ext, mimetype in SIGNATURES:
+        if data.startswith(magic):
+            return ext, mimetype
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    return None, None
+
+
+# ---------- STORAGE LAYOUT ----------
+# <root>/<hash[:2]>/<hash>.<ext>          original upload
+# <root>/<hash[:2]>/<hash>_<size>.webp    square variant
+def _dir_for(root, avatar_hash):
+    return os.path.join(root, avatar_hash[:2])
+
+
+def original_path(root, avatar_hash):
+    directory = _dir_for(root, avatar_hash)
+    for ext in ORIGINAL_EXTENSIONS:
+        path = os.path.join(directory, f"{avatar_hash}.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def variant_path(root, avatar_hash, size):
+    return os.path.join(_dir_for(root, avatar_hash), f"{avatar_hash}_{size}.{VARIANT_FORMAT[1]}")
+
+
+def _atomic_write(path, write):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+# ---------- UPLOAD ----------
+def store_avatar(root, data):
+    """Store an upload under its SHA-256; returns (hash, created).
+
+    Identical uploads from any user share one original and one set of
+    variants, so a re-upload is a hash and a stat.
+    """
+    ext, _ = sniff_image_type(data)
+    if ext is None:
+        raise AvatarError("File is not a PNG, JPEG, GIF or WebP image")
+
+    if Image is not None:
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                width, height = img.size
+                img.verify()
+        except Exception as exc:
+            raise AvatarError("Image could not be decoded") from exc
+        if width * height > MAX_PIXELS:
+            raise AvatarError("Image dimensions are too large")
+
+    avatar_hash = hashlib.sha256(data).hexdigest()
+    if original_path(root, avatar_hash):
+        return avatar_hash, False
+
+    path = os.path.join(_dir_for(root, avatar_hash), f"{avatar_hash}.{ext}")
+    _atomic_write(path, lambda f: f.write(data))
+    return avatar_hash, True
+
+
+def missing_variants(root, avatar_hash, sizes):
+    if Image is None:
+        return []
+    return [s for s in sizes if not os.path.exists(variant_path(root, avatar_hash, s))]
+
+
+# ---------- VARIANTS ----------
+def build_variants(root, avatar_hash, sizes):
+    """Decode the original once and write every missing square variant."""
+    sizes = missing_variants(root, avatar_hash, sizes)
+    source = original_path(root, avatar_hash)
+    if not sizes or source is None:
+        return []
+
+    with Image.open(source) as img:
+        img.seek(0)  # first frame of an animated GIF
+        # JPEG: let the decoder scale down by up to 8x instead of decoding full size
+        img.draft("RGB", (max(sizes) * 2, max(sizes) * 2))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+        # Downscale once to the largest size; smaller sizes resample from that
+        largest = ImageOps.fit(img, (max(sizes), max(sizes)), Image.LANCZOS)
+
+    for size in sorted(sizes, reverse=True):
+        variant = largest if size == largest.width else largest.resize((size, size), Image.LANCZOS)
+        _atomic_write(
+            variant_path(root, avatar_hash, size),
+            lambda f, v=variant: v.save(f, VARIANT_FORMAT[0], quality=80, method=4),
+        )
+    return sizes
+
+
+@job_handler("avatar_variants")
+def run_avatar_variants_job(payload):
+    built = build_variants(payload["root"], payload["hash"], payload["sizes"])
+    if built:
+        logger.info("Built avatar variants %s for %s", built, payload["hash"][:12])
+
+
+# ---------- SERVING ----------
+def pick_size(sizes, requested):
+    """Smallest configured size that covers ``requested`` (largest if none do)."""
+    ordered = sorted(sizes)
+    for size in ordered:
+        if size >= requested:
+            return size
+    return ordered[-1]
+
+
+def resolve_avatar(root, avatar_hash, size):
+    """Best file for ``size``: (path, mimetype, is_variant), or None if unknown."""
+    path = variant_path(root, avatar_hash, size)
+    if os.path.exists(path):
+        return path, VARIANT_FORMAT[2], True
+
+    # Variants still being built (or no Pillow): fall back to the original
+    path = original_path(root, avatar_hash)
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        _, mimetype = sniff_image_type(f.read(16))
+    return path, mimetype, False
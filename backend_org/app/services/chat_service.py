@@ -1,7 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import google.generativeai as genai
+import threading
+
+from flask import current_app
+from pymongo import ReturnDocument, ASCENDING, DESCENDING
 
 import app.extensions as ext
+from app.services.llm_service import get_llm_client
+from app.services.response_cache import get_response_cache
+from app.services.context_service import build_chat_prompt, window_push_update
+from app.services.watermark_service import bump_watermark
+from app.services.event_bus import publish_event, chat_session_event, deletion_event
+from app.services.sync_service import record_tombstone
+from app.utils.cursor import encode_cursor, keyset_filter
+from app.utils.text_search import query_terms, make_snippet
 
 
 def get_chat_sessions_collection():
@@ -19,10 +31,15 @@ def get_chat_messages_collection():
 # ---------- TOUCH CHAT ----------
 def touch_chat_session(session_id):
     chat_sessions = get_chat_sessions_collection()
-    chat_sessions.update_one(
+    session = chat_sessions.find_one_and_update(
         {"_id": session_id},
         {"$set": {"updatedAt": datetime.now()}},
+        projection={"user_id": 1, "title": 1, "updatedAt": 1},
+        return_document=ReturnDocument.AFTER,
     )
+    if session:
+        bump_watermark(session.get("user_id"), "chats")
+        publish_event(session.get("user_id"), chat_session_event(session_id, session))
 
 
 # ---------- START CHAT ----------
@@ -37,6 +54,8 @@ def create_chat_session(user_id):
     }
 
     result = chat_sessions.insert_one(chat)
+    bump_watermark(user_id, "chats")
+    publish_event(user_id, chat_session_event(result.inserted_id, chat))
     return result.inserted_id
 
 
@@ -55,15 +74,141 @@ def save_chat_message(session_id, user_id, sender, message):
 
     chat_sessions.update_one(
         {"_id": session_id},
-        {"$set": {"updatedAt": datetime.now()}},
+        {
+            "$set": {"updatedAt": datetime.now()},
+            "$push": window_push_update((sender, message)),
+        },
     )
+    bump_watermark(user_id, "chats")
+
+
+# ---------- SAVE CHAT TURN ----------
+_write_behind_pool = None
+_write_behind_lock = threading.Lock()
+
+
+def _get_write_behind_pool():
+    global _write_behind_pool
+    if _write_behind_pool is None:
+        with _write_behind_lock:
+            if _write_behind_pool is None:
+                _write_behind_pool = ThreadPoolExecutor(
+                    max_workers=current_app.config.get("CHAT_WRITE_BEHIND_WORKERS", 4),
+                    thread_name_prefix="chat-write-behind",
+                )
+    return _write_behind_pool
+
+
+def _message_doc(session_id, user_id, sender, message):
+    return {
+        "session_id": session_id,
+        "user_id": user_id,
+        "sender": sender,
+        "message": message,
+        "timestamp": datetime.now(),
+    }
+
+
+def begin_chat_turn(session_id, user_id, user_message):
+    """Start a /chat turn; pair with complete_chat_turn once the reply exists.
+
+    With CHAT_WRITE_BEHIND the user message is inserted on a background
+    thread so the write overlaps the model call. Otherwise nothing is written
+    until the turn completes.
+    """
+    turn = {
+        "session_id": session_id,
+        "user_id": user_id,
+        "user_doc": _message_doc(session_id, user_id, "user", user_message),
+        "pending": None,
+    }
+    if current_app.config.get("CHAT_WRITE_BEHIND"):
+        turn["pending"] = _get_write_behind_pool().submit(
+            get_chat_messages_collection().insert_one, turn["user_doc"]
+        )
+    return turn
+
+
+def complete_chat_turn(turn, reply):
+    chat_messages = get_chat_messages_collection()
+    chat_sessions = get_chat_sessions_collection()
+    session_id = turn["session_id"]
+    user_id = turn["user_id"]
+    user_doc = turn["user_doc"]
+
+    docs = [_message_doc(session_id, user_id, "assistant", reply)]
+    if turn["pending"] is None:
+        docs.insert(0, user_doc)
+    else:
+        try:
+            turn["pending"].result()
+        except Exception:
+            current_app.logger.exception("Write-behind insert failed; retrying inline")
+            user_doc.pop("_id", None)
+            docs.insert(0, user_doc)
+
+    # One batched insert for the messages, one update for the session
+    chat_messages.insert_many(docs, ordered=True)
+    session = chat_sessions.find_one_and_update(
+        {"_id": session_id},
+        {
+            "$set": {"updatedAt": datetime.now()},
+            "$push": window_push_update(
+                ("user", user_doc["message"]), ("assistant", reply)
+            ),
+        },
+        projection={"user_id": 1, "title": 1, "updatedAt": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    bump_watermark(user_id, "chats")
+    if session:
+        publish_event(user_id, chat_session_event(session_id, session))
+
+
+# ---------- PROMPT ----------
+def _prompt_and_cache(user_message, session_id):
+    prompt = user_message
+    if session_id is not None:
+        prompt = build_chat_prompt(session_id, user_message)
+
+    # Cached replies are context-free, so only use them for standalone questions
+    cache = get_response_cache() if prompt == user_message else None
+    return prompt, cache
 
 
 # ---------- GENERATE AI RESPONSE ----------
-def generate_ai_reply(user_message):
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    response = model.generate_content(user_message)
-    return response.text.strip()
+def generate_ai_reply(user_message, session_id=None):
+    prompt, cache = _prompt_and_cache(user_message, session_id)
+    if cache is not None:
+        cached = cache.get(user_message)
+        if cached is not None:
+            return cached
+
+    reply = get_llm_client().generate(prompt).strip()
+
+    if cache is not None:
+        cache.put(user_message, reply)
+    return reply
+
+
+# ---------- STREAM AI RESPONSE ----------
+def stream_ai_reply(user_message, session_id=None):
+    prompt, cache = _prompt_and_cache(user_message, session_id)
+    if cache is not None:
+        cached = cache.get(user_message)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    for text in get_llm_client().stream(prompt):
+        parts.append(text)
+        yield text
+
+    # Only complete replies are cached; an aborted stream never gets here
+    if cache is not None:
+        cache.put(user_message, "".join(parts).strip())
 
 
 # ---------- GET CHAT HISTORY ----------
@@ -77,41 +222,115 @@ def get_user_chats(user_id):
 
 
 # ---------- GET CHAT MESSAGES ----------
-def get_chat_messages(session_id):
+def welcome_message(session_id):
+    return {
+        "session_id": str(session_id),
+        "user_id": None,
+        "sender": "assistant",
+        "message": (
+            "Hello! I'm your LexiMate AI assistant. "
+            "I'm here to help you with legal questions. "
+            "How can I assist you today?"
+        ),
+        "timestamp": None,
+    }
+
+
+def serialize_message(msg):
+    return {
+        "session_id": str(msg["session_id"]),
+        "user_id": str(msg["user_id"]),
+        "sender": msg["sender"],
+        "message": msg["message"],
+        "timestamp": msg["timestamp"].isoformat() if msg.get("timestamp") else None,
+    }
+
+
+def get_chat_messages(session_id, before=None, limit=None):
+    """Return (messages, next_before) for a session, oldest message first.
+
+    Without ``limit`` the whole history is returned as a lazy iterator over
+    the cursor. With ``limit`` the newest page older than the ``before``
+    keyset (timestamp, _id) is returned, and ``next_before`` points at the
+    page after it (or is None when history is exhausted).
+    """
     chat_messages = get_chat_messages_collection()
+    projection = {"session_id": 1, "user_id": 1, "sender": 1, "message": 1, "timestamp": 1}
 
-    raw_messages = list(
-        chat_messages.find(
-            {"session_id": session_id}   # ✅ already ObjectId
-        ).sort("timestamp", 1)
+    if not limit:
+        cursor = chat_messages.find(
+            {"session_id": session_id},   # ✅ already ObjectId
+            projection,
+        ).sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+        return (serialize_message(m) for m in cursor), None
+
+    query = {"session_id": session_id}
+    if before is not None:
+        query.update(keyset_filter("timestamp", *before))
+
+    page = list(
+        chat_messages.find(query, projection)
+        .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
     )
 
-    if not raw_messages:
-        return [
+    next_before = None
+    if len(page) > limit:
+        page = page[:limit]
+        oldest = page[-1]
+        next_before = encode_cursor(oldest["timestamp"], oldest["_id"])
+
+    page.reverse()
+    return (serialize_message(m) for m in page), next_before
+
+
+# ---------- SEARCH CHAT MESSAGES ----------
+def search_chat_messages(user_id, q, limit=20, skip=0):
+    """Ranked full-text search across a user's messages (text index, migration 9).
+
+    Returns (hits, has_more); hits carry the session id and title, timestamp,
+    sender, textScore and a highlighted snippet.
+    """
+    chat_messages = get_chat_messages_collection()
+    chat_sessions = get_chat_sessions_collection()
+
+    rows = list(
+        chat_messages.find(
+            {"user_id": user_id, "$text": {"$search": q}},
             {
-                "session_id": str(session_id),
-                "user_id": None,
-                "sender": "assistant",
-                "message": (
-                    "Hello! I'm your LexiMate AI assistant. "
-                    "I'm here to help you with legal questions. "
-                    "How can I assist you today?"
-                ),
-                "timestamp": None,
-            }
-        ]
-
-    messages = []
-    for msg in raw_messages:
-        messages.append({
-            "session_id": str(msg["session_id"]),
-            "user_id": str(msg["user_id"]),
-            "sender": msg["sender"],
-            "message": msg["message"],
-            "timestamp": msg["timestamp"].isoformat() if msg.get("timestamp") else None,
-        })
+                "session_id": 1,
+                "sender": 1,
+                "message": 1,
+                "timestamp": 1,
+                "score": {"$meta": "textScore"},
+            },
+        )
+        .sort([("score", {"$meta": "textScore"})])
+        .skip(skip)
+        .limit(limit + 1)
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    return messages
+    session_ids = list({row["session_id"] for row in rows})
+    titles = {
+        s["_id"]: s.get("title")
+        for s in chat_sessions.find({"_id": {"$in": session_ids}}, {"title": 1})
+    } if session_ids else {}
+
+    terms = query_terms(q)
+    hits = []
+    for row in rows:
+        hits.append({
+            "message_id": str(row["_id"]),
+            "session_id": str(row["session_id"]),
+            "session_title": titles.get(row["session_id"]),
+            "sender": row.get("sender"),
+            "timestamp": row["timestamp"].isoformat() if row.get("timestamp") else None,
+            "score": row.get("score"),
+            "snippet": make_snippet(row.get("message"), terms),
+        })
+    return hits, has_more
 
 
 # ---------- DELETE CHAT ----------
@@ -119,7 +338,7 @@ def delete_chat_session(session_id, user_id):
     chat_sessions = get_chat_sessions_collection()
     chat_messages = get_chat_messages_collection()
 
-    chat_sessions.delete_one({
+    result = chat_sessions.delete_one({
         "_id": session_id,
         "user_id": user_id,
     })
@@ -128,3 +347,8 @@ def delete_chat_session(session_id, user_id):
         "session_id": session_id,
         "user_id": user_id,
     })
+
+    if result.deleted_count:
+        deleted_at = record_tombstone(user_id, "chat_session", session_id)
+        publish_event(user_id, deletion_event("chat_session", session_id, deleted_at))
+    bump_watermark(user_id, "chats")
@@ -0,0 +1,146 @@
+from flask import current_app
+
+import app.extensions as ext
+from app.services.llm_service import get_llm_client
+
+SPEAKERS = {"user": "User", "assistant": "Assistant"}
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and LexiMate, a legal assistant.
+Merge the new messages into the existing summary. Keep parties, dates, jurisdictions, amounts,
+document types and open questions; drop pleasantries. Answer with the updated summary only,
+in at most {max_words} words.
+
+Existing summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+
+def get_chat_sessions_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["chat_sessions"]
+
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for budgeting English prose
+    return len(text or "") // 4 + 1
+
+
+def _format_turn(turn):
+    speaker = SPEAKERS.get(turn.get("sender"), "User")
+    return f"{speaker}: {turn.get('message', '')}"
+
+
+# ---------- WINDOW UPDATE (called on every saved message) ----------
+def window_push_update(*turns):
+    """Build the $push clause appending (sender, message) pairs to the window."""
+    config = current_app.config
+    hard_cap = (config.get("CONTEXT_MAX_MESSAGES", 8) + config.get("CONTEXT_SUMMARY_STRIDE", 6)) * 2
+    return {
+        "context_window": {
+            "$each": [{"sender": sender, "message": message} for sender, message in turns],
+            "$slice": -hard_cap,
+        }
+    }
+
+
+# ---------- SUMMARY ----------
+def _extractive_summary(summary, turns, max_chars):
+    lines = [summary] if summary else []
+    lines += [_format_turn(t)[:280] for t in turns]
+    text = "\n".join(lines)
+    return text[-max_chars:]
+
+
+def _summarize(summary, turns):
+    config = current_app.config
+    max_tokens = config.get("CONTEXT_SUMMARY_MAX_TOKENS", 300)
+    max_chars = max_tokens * 4
+    prompt = SUMMARY_PROMPT.format(
+        max_words=int(max_tokens * 0.75),
+        summary=summary or "(none)",
+        messages="\n".join(_format_turn(t) for t in turns),
+    )
+    try:
+        updated = get_llm_client().generate(prompt).strip()
+    except Exception:
+        current_app.logger.exception("Context summary failed; using extractive fallback")
+        updated = ""
+    if not updated:
+        return _extractive_summary(summary, turns, max_chars)
+    return updated[:max_chars]
+
+
+def _slide_window(session_id, summary, window):
+    # Fold the oldest messages into the summary and drop exactly that many
+    # from the stored window, so messages pushed meanwhile are kept. Matching
+    # on the previous summary stops two concurrent slides from both applying.
+    keep = current_app.config.get("CONTEXT_MAX_MESSAGES", 8)
+    folded = window[:-keep]
+    previous = summary or None
+    summary = _summarize(summary, folded)
+
+    get_chat_sessions_collection().update_one(
+        {"_id": session_id, "context_summary": previous},
+        [{
+            "$set": {
+                "context_summary": summary,
+                "context_window": {
+                    "$slice": [
+                        "$context_window",
+                        len(folded),
+                        {"$max": [{"$size": "$context_window"}, 1]},
+                    ]
+                },
+            }
+        }],
+    )
+    return summary, window[-keep:]
+
+
+# ---------- BUILD PROMPT ----------
+def build_chat_prompt(session_id, user_message):
+    config = current_app.config
+    max_messages = config.get("CONTEXT_MAX_MESSAGES", 8)
+    stride = config.get("CONTEXT_SUMMARY_STRIDE", 6)
+    budget = config.get("CONTEXT_TOKEN_BUDGET", 1500)
+
+    session = get_chat_sessions_collection().find_one(
+        {"_id": session_id},
+        {"context_summary": 1, "context_window": 1},
+    ) or {}
+    summary = session.get("context_summary") or ""
+    window = list(session.get("context_window") or [])
+
+    # The caller usually persists the user message before generating
+    if window and window[-1].get("sender") == "user" and window[-1].get("message") == user_message:
+        window.pop()
+
+    # Summarize in strides so the summary is recomputed only when the window slides
+    if len(window) > max_messages + stride:
+        summary, window = _slide_window(session_id, summary, window)
+
+    recent = []
+    used = 0
+    for turn in reversed(window[-max_messages:]):
+        line = _format_turn(turn)
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        recent.append(line)
+        used += cost
+    recent.reverse()
+
+    if not summary and not recent:
+        return user_message
+
+    sections = []
+    if summary:
+        sections.append(f"Summary of the earlier conversation:\n{summary}")
+    if recent:
+        sections.append("Recent conversation:\n" + "\n".join(recent))
+    sections.append(f"User: {user_message}\nAssistant:")
+    return "\n\n".join(sections)
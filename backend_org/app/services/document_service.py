@@ -1,5 +1,26 @@
 from datetime import datetime
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+
 import app.extensions as ext
+from app.services.watermark_service import bump_watermark
+from app.services.event_bus import publish_event, document_event, deletion_event
+from app.services.sync_service import record_tombstone
+from app.utils.cursor import keyset_filter
+from app.utils.text_search import query_terms, make_snippet
+from app.services.template_registry import get_template_registry, TemplateValidationError
+from app.services.job_queue import job_handler, PermanentJobError
+from app.services.render_scheduler import schedule_pdf_render
+
+# Fields needed by list views (Dashboard cards, document tables)
+SUMMARY_PROJECTION = {
+    "type": 1,
+    "status": 1,
+    "companyName": 1,
+    "counterpartyName": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+}
 
 
 def get_nda_collection():
@@ -9,9 +30,93 @@ def get_nda_collection():
 
 
 # ---------- GET DOCUMENTS FOR USER ----------
-def get_documents_for_user(user_id):
+def get_documents_for_user(user_id, limit=None, after=None,
+                           include_text=False, summary=False):
+    """List a user's documents, newest ``updatedAt`` first.
+
+    ``after`` is an (updatedAt, _id) keyset cursor. With ``limit`` set, one
+    extra row is fetched so the caller can tell whether another page exists.
+    """
+    nda_collection = get_nda_collection()
+
+    query = {"user_id": user_id}
+    if after is not None:
+        query.update(keyset_filter("updatedAt", *after))
+
+    if summary:
+        projection = SUMMARY_PROJECTION
+    elif include_text:
+        projection = None
+    else:
+        projection = {"generatedText": 0, "pdfCacheKey": 0}
+
+    cursor = nda_collection.find(query, projection).sort(
+        [("updatedAt", DESCENDING), ("_id", DESCENDING)]
+    )
+    if limit:
+        cursor = cursor.limit(limit + 1)
+    return list(cursor)
+
+
+# ---------- DOCUMENT STATS ----------
+def get_document_stats(user_id):
+    # Counted in Mongo so the Dashboard never downloads the whole list
+    rows = get_nda_collection().aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+    ])
+    by_status = {}
+    for row in rows:
+        # Rows without a status show as drafts, as in the list views
+        status = str(row["_id"] or "draft")
+        by_status[status] = by_status.get(status, 0) + row["count"]
+    return {"total": sum(by_status.values()), "byStatus": by_status}
+
+
+# ---------- SEARCH DOCUMENTS ----------
+def search_documents(user_id, q, doc_type=None, status=None,
+                     date_from=None, date_to=None, limit=20, skip=0):
+    """Ranked full-text search over a user's documents (text index, migration 8).
+
+    Returns (results, has_more); each result carries its textScore and a
+    highlighted snippet instead of the full generatedText.
+    """
     nda_collection = get_nda_collection()
-    return list(nda_collection.find({"user_id": user_id}))
+
+    query = {"user_id": user_id, "$text": {"$search": q}}
+    if doc_type:
+        query["type"] = doc_type
+    if status:
+        query["status"] = status
+    if date_from or date_to:
+        query["updatedAt"] = {}
+        if date_from:
+            query["updatedAt"]["$gte"] = date_from
+        if date_to:
+            query["updatedAt"]["$lte"] = date_to
+
+    projection = dict(SUMMARY_PROJECTION)
+    projection.update({
+        "purpose": 1,
+        "generatedText": 1,
+        "score": {"$meta": "textScore"},
+    })
+
+    rows = list(
+        nda_collection.find(query, projection)
+        .sort([("score", {"$meta": "textScore"})])
+        .skip(skip)
+        .limit(limit + 1)
+    )
+    has_more = len(rows) > limit
+
+    terms = query_terms(q)
+    results = []
+    for row in rows[:limit]:
+        source = row.pop("generatedText", None) or row.get("purpose") or ""
+        row["snippet"] = make_snippet(source, terms)
+        results.append(row)
+    return results, has_more
 
 
 # ---------- GET DOCUMENT BY ID ----------
@@ -27,17 +132,46 @@ def get_document_by_id(doc_id):
 # ---------- DELETE DOCUMENT ----------
 def delete_document_by_id(doc_id):
     nda_collection = get_nda_collection()
-    nda_collection.delete_one({"_id": doc_id})
+    deleted = nda_collection.find_one_and_delete({"_id": doc_id}, {"user_id": 1})
+    if deleted:
+        user_id = deleted.get("user_id")
+        deleted_at = record_tombstone(user_id, "document", doc_id)
+        bump_watermark(user_id, "documents")
+        publish_event(user_id, deletion_event("document", doc_id, deleted_at))
 
 
 # ---------- UPDATE DOCUMENT ----------
 def update_document_fields(doc_id, fields):
     nda_collection = get_nda_collection()
     fields["updatedAt"] = datetime.now()
-    nda_collection.update_one(
+
+    update = {"$set": fields}
+    if "generatedText" in fields or "type" in fields:
+        # The file under the old key may be shared by documents with the same
+        # text, so only this document's reference to it is dropped
+        update["$unset"] = {"pdfCacheKey": "", "pdfRender": ""}
+
+    before = nda_collection.find_one_and_update(
         {"_id": doc_id},
-        {"$set": fields},
+        update,
+        projection={"user_id": 1, "status": 1},
+        return_document=ReturnDocument.BEFORE,
     )
+    if not before:
+        return
+
+    user_id = before.get("user_id")
+    bump_watermark(user_id, "documents")
+    publish_event(user_id, document_event(doc_id, {
+        "status": fields.get("status", before.get("status")),
+        "updatedAt": fields["updatedAt"],
+    }))
+
+
+# ---------- PDF CACHE KEY ----------
+def set_document_pdf_key(doc_id, key):
+    # Bookkeeping only: not a user-visible change, so no updatedAt/watermark bump
+    get_nda_collection().update_one({"_id": doc_id}, {"$set": {"pdfCacheKey": key}})
 
 
 # ---------- INSERT DOCUMENT ----------
@@ -46,48 +180,152 @@ def insert_document(doc):
     now = datetime.now()
     doc["createdAt"] = now
     doc["updatedAt"] = now
-    return nda_collection.insert_one(doc).inserted_id
+    inserted_id = nda_collection.insert_one(doc).inserted_id
+    bump_watermark(doc.get("user_id"), "documents")
+    publish_event(doc.get("user_id"), document_event(inserted_id, doc))
+    return inserted_id
 
 
 # ---------- GENERATE DOCUMENT TEXT ----------
-def generate_document_text(doc_type, data):
-    if doc_type == "nda":
-        return f"""
-NON-DISCLOSURE AGREEMENT (NDA)
-
-This Agreement is entered into on {data.get('effectiveDate')}
-between {data.get('disclosingParty')} ("Disclosing Party") and
-{data.get('receivingParty')} ("Receiving Party").
-
-Purpose:
-{data.get('purpose')}
-
-Confidentiality Level: {data.get('confidentialityLevel')}
-Duration: {data.get('duration')}
-
-Additional Terms:
-{data.get('additionalTerms')}
-"""
-
-    if doc_type == "contract":
-        return f"""
-FREELANCE CONTRACT AGREEMENT
-
-Client: {data.get('clientName')}
-Freelancer: {data.get('freelancerName')}
-Project: {data.get('projectTitle')}
-Payment: {data.get('paymentAmount')} via {data.get('paymentMethod')}
-"""
-
-    if doc_type == "service":
-        return f"""
-SERVICE AGREEMENT
-
-Company: {data.get('companyName')}
-Client: {data.get('counterpartyName')}
-Purpose: {data.get('purpose')}
-Duration: {data.get('duration')}
-Governing Law: {data.get('governingLaw')}
-"""
-
-    return None
+def render_document(doc_type, data, version=None):
+    """Render with the registry template; returns (text, version).
+
+    Returns (None, None) for an unknown type or version and raises
+    TemplateValidationError when required fields are missing.
+    """
+    template = get_template_registry().get(doc_type, version)
+    if template is None:
+        return None, None
+    return template.render(data), template.version
+
+
+def generate_document_text(doc_type, data, version=None):
+    return render_document(doc_type, data, version)[0]
+
+
+# ---------- GENERATION JOBS ----------
+def _mark_generation_failed(job, error):
+    update_document_fields(job["doc_id"], {"status": "failed", "generationError": error})
+
+
+@job_handler("generate_document", on_failure=_mark_generation_failed)
+def run_generate_document_job(payload):
+    doc_id = ObjectId(payload["documentId"])
+    try:
+        text, version = render_document(
+            payload["documentType"], payload["fields"], payload.get("templateVersion")
+        )
+    except TemplateValidationError as exc:
+        raise PermanentJobError(str(exc)) from exc
+    if text is None:
+        raise PermanentJobError("Invalid document type")
+
+    update_document_fields(doc_id, {
+        "generatedText": text,
+        "templateVersion": version,
+        "status": "completed",
+        "generationError": None,
+    })
+    schedule_pdf_render(doc_id, text)
+
+
+# ---------- BATCH GENERATION ----------
+DOCUMENT_FIELDS = (
+    "companyName",
+    "counterpartyName",
+    "effectiveDate",
+    "duration",
+    "governingLaw",
+    "confidentialityLevel",
+    "purpose",
+    "additionalTerms",
+)
+
+
+def build_generated_document(user_id, doc_type, data, version=None):
+    # createdAt/updatedAt are stamped by _insert_batch
+    text, version = render_document(doc_type, data, version)
+    if text is None:
+        return None
+    doc = {"user_id": user_id, "type": doc_type, "templateVersion": version}
+    for field in DOCUMENT_FIELDS:
+        doc[field] = data.get(field)
+    doc["generatedText"] = text
+    doc["status"] = "completed"
+    return doc
+
+
+def _insert_batch(nda_collection, user_id, pending):
+    """insert_many one chunk; yields a result per row in input order."""
+    # Stamped as the chunk goes in, not when the request started: rows of a
+    # long batch must not land behind a watermark /sync has already handed out
+    now = datetime.now()
+    for _, doc in pending:
+        doc["createdAt"] = doc["updatedAt"] = now
+
+    errors = {}
+    try:
+        result = nda_collection.insert_many([doc for _, doc in pending], ordered=False)
+        inserted_ids = result.inserted_ids
+    except BulkWriteError as exc:
+        # insert_many assigns _id client-side before sending
+        inserted_ids = [doc["_id"] for _, doc in pending]
+        for err in exc.details.get("writeErrors", []):
+            errors[err["index"]] = err.get("errmsg", "Insert failed")
+
+    for i, (row, doc) in enumerate(pending):
+        if i in errors:
+            yield {"row": row, "error": errors[i]}
+        else:
+            publish_event(user_id, document_event(inserted_ids[i], doc))
+            yield {"row": row, "documentId": str(inserted_ids[i]), "status": "completed"}
+
+
+def _flush_chunk(nda_collection, user_id, chunk):
+    # Rows that failed validation wait for the chunk's insert so results
+    # come out in row order
+    inserted = _insert_batch(
+        nda_collection, user_id, [(row, doc) for row, doc, _ in chunk if doc is not None]
+    )
+    for row, doc, error in chunk:
+        yield error if doc is None else next(inserted)
+
+
+def generate_documents_batch(user_id, doc_type, rows, common=None, batch_size=500, version=None):
+    """Render and insert one document per row, yielding per-row results.
+
+    ``rows`` may be any iterable of dicts (a parsed JSON array or a streaming
+    csv.DictReader); ``common`` fields apply to every row unless overridden.
+    Inserts go out ``batch_size`` rows at a time, so memory stays bounded,
+    and results are yielded in row order.
+    """
+    if get_template_registry().get(doc_type, version) is None:
+        raise ValueError("Invalid document type")
+
+    nda_collection = get_nda_collection()
+    common = common or {}
+    chunk = []
+    inserted = 0
+
+    for row, data in enumerate(rows):
+        if not isinstance(data, dict):
+            chunk.append((row, None, {"row": row, "error": "Row must be an object"}))
+        else:
+            try:
+                doc = build_generated_document(user_id, doc_type, {**common, **data}, version)
+                chunk.append((row, doc, None))
+            except TemplateValidationError as exc:
+                chunk.append((row, None, {"row": row, "error": str(exc), "fields": exc.errors}))
+        if len(chunk) >= batch_size:
+            for result in _flush_chunk(nda_collection, user_id, chunk):
+                inserted += "documentId" in result
+                yield result
+            chunk = []
+
+    if chunk:
+        for result in _flush_chunk(nda_collection, user_id, chunk):
+            inserted += "documentId" in result
+            yield result
+
+    if inserted:
+        bump_watermark(user_id, "documents")
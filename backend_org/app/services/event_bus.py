@@ -0,0 +1,211 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def document_event(doc_id, doc):
+    return {
+        "type": "document",
+        "id": str(doc_id),
+        "status": doc.get("status"),
+        "updatedAt": _iso(doc.get("updatedAt")),
+    }
+
+
+def chat_session_event(session_id, session):
+    return {
+        "type": "chat_session",
+        "id": str(session_id),
+        "title": session.get("title"),
+        "updatedAt": _iso(session.get("updatedAt")),
+    }
+
+
+def deletion_event(kind, ref_id, deleted_at):
+    return {
+        "type": f"{kind}_deleted",
+        "id": str(ref_id),
+        "deletedAt": _iso(deleted_at),
+    }
+
+
+def tombstone_event(tombstone_id, tombstone):
+    return deletion_event(tombstone.get("kind"), tombstone.get("ref_id"), tombstone.get("deletedAt"))
+
+
+# ---------- SUBSCRIPTION ----------
+class Subscription:
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event):
+        # A slow client must never block publishers: drop its oldest event
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+# ---------- BROKERS ----------
+class LocalBroker:
+    """In-process fan-out; sufficient when a single worker serves all clients."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        sub = Subscription(self, str(user_id))
+        with self._lock:
+            self._subscribers.setdefault(sub.user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def _dispatch(self, user_id, event):
+        with self._lock:
+            subs = list(self._subscribers.get(str(user_id), ()))
+        for sub in subs:
+            sub.offer(event)
+
+    def publish(self, user_id, event):
+        if user_id:
+            self._dispatch(user_id, event)
+
+
+class MongoChangeStreamBroker(LocalBroker):
+    """Fans out writes made by any worker by tailing a MongoDB change stream.
+
+    Requires a replica set. Local publish() calls are ignored because every
+    write comes back through the stream, including this worker's own.
+    """
+
+    WATCHED = {
+        "nda_agreements": document_event,
+        "chat_sessions": chat_session_event,
+        "tombstones": tombstone_event,
+    }
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self._watcher = None
+        self._watcher_pid = None
+        self._start_lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        pass
+
+    def subscribe(self, user_id):
+        self._ensure_watcher()
+        return super().subscribe(user_id)
+
+    def _ensure_watcher(self):
+        pid = os.getpid()
+        with self._start_lock:
+            if self._watcher is not None and self._watcher.is_alive() and self._watcher_pid == pid:
+                return
+            self._watcher = threading.Thread(target=self._watch, name="event-bus-watch", daemon=True)
+            self._watcher_pid = pid
+            self._watcher.start()
+
+    def _pipeline(self):
+        return [
+            {"$match": {
+                "ns.coll": {"$in": list(self.WATCHED)},
+                "operationType": {"$in": ["insert", "update", "replace"]},
+            }},
+            # Keep the stream light: never ship generatedText or messages
+            {"$project": {
+                "ns": 1,
+                "documentKey": 1,
+                "fullDocument.user_id": 1,
+                "fullDocument.status": 1,
+                "fullDocument.title": 1,
+                "fullDocument.kind": 1,
+                "fullDocument.ref_id": 1,
+                "fullDocument.deletedAt": 1,
+                "fullDocument.updatedAt": 1,
+            }},
+        ]
+
+    def _watch(self):
+        resume_token = None
+        while True:
+            try:
+                with self.db.watch(
+                    self._pipeline(),
+                    full_document="updateLookup",
+                    resume_after=resume_token,
+                ) as stream:
+                    for change in stream:
+                        resume_token = stream.resume_token
+                        doc = change.get("fullDocument") or {}
+                        build = self.WATCHED.get(change["ns"]["coll"])
+                        if build and doc.get("user_id"):
+                            self._dispatch(doc["user_id"], build(change["documentKey"]["_id"], doc))
+            except PyMongoError:
+                logger.exception("Change stream interrupted; reconnecting")
+                time.sleep(1)
+
+
+# ---------- PER-PROCESS BROKER ----------
+_broker = LocalBroker()
+
+
+def init_event_bus(app, db):
+    global _broker
+    backend = app.config.get("EVENT_BUS_BACKEND", "local")
+    if backend == "mongo":
+        _broker = MongoChangeStreamBroker(db)
+    elif backend == "local":
+        _broker = LocalBroker()
+    else:
+        raise ValueError(f"Unknown event bus backend: {backend}")
+
+
+def get_event_bus():
+    return _broker
+
+
+def publish_event(user_id, event):
+    try:
+        _broker.publish(user_id, event)
+    except Exception:
+        # Notifications are best-effort; never fail the write that triggered them
+        logger.exception("Failed to publish %s event", event.get("type"))
@@ -0,0 +1,163 @@
+import io
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import DESCENDING
+from werkzeug.utils import secure_filename
+
+import app.extensions as ext
+from app.services.pdf_cache import get_pdf_cache, pdf_cache_key
+from app.services.pdf_service import render_text_pdf
+from app.services.render_scheduler import submit_pdf_render
+
+EXPORT_FORMATS = ("pdf", "txt", "both")
+COPY_CHUNK = 64 * 1024
+
+EXPORT_PROJECTION = {
+    "type": 1,
+    "companyName": 1,
+    "counterpartyName": 1,
+    "generatedText": 1,
+    "updatedAt": 1,
+}
+
+
+def get_nda_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["nda_agreements"]
+
+
+# ---------- SELECTION ----------
+def find_documents_for_export(user_id, ids=None, doc_type=None, status=None,
+                              date_from=None, date_to=None, limit=1000):
+    query = {"user_id": user_id, "generatedText": {"$nin": [None, ""]}}
+    if ids:
+        query["_id"] = {"$in": ids}
+    if doc_type:
+        query["type"] = doc_type
+    if status:
+        query["status"] = status
+    if date_from or date_to:
+        query["updatedAt"] = {}
+        if date_from:
+            query["updatedAt"]["$gte"] = date_from
+        if date_to:
+            query["updatedAt"]["$lte"] = date_to
+
+    # Small batches: the cursor is drained while the archive streams out
+    return (
+        get_nda_collection()
+        .find(query, EXPORT_PROJECTION)
+        .sort([("updatedAt", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit)
+        .batch_size(20)
+    )
+
+
+# ---------- ZIP STREAMING ----------
+class _ChunkSink:
+    # Write-only file object for ZipFile: no tell()/seek(), so zipfile
+    # falls back to streaming mode with data descriptors.
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _entry_base(doc):
+    parts = [doc.get("type") or "document", doc.get("companyName"), str(doc["_id"])]
+    return secure_filename("_".join(p for p in parts if p)) or str(doc["_id"])
+
+
+def _zip_info(name, doc, compress):
+    updated = doc.get("updatedAt") or datetime.now()
+    info = zipfile.ZipInfo(name, date_time=updated.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    return info
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _pdf_future(text, fallback_pool):
+    cache = get_pdf_cache()
+    key = pdf_cache_key(text)
+    path = cache.get(key)
+    if path:
+        return _done(path)
+    # Shares the pre-render pool's max_pending bound; when it is full (or
+    # pre-rendering is off) this export renders on its own threads instead
+    future = submit_pdf_render(text)
+    if future is None:
+        future = fallback_pool.submit(cache.put, key, lambda out: render_text_pdf(text, out))
+    return future
+
+
+def _open_pdf(text, future):
+    try:
+        return open(future.result(), "rb")
+    except Exception:
+        # Evicted between render and read, or the pool failed: render here
+        buffer = io.BytesIO()
+        render_text_pdf(text, buffer)
+        buffer.seek(0)
+        return buffer
+
+
+def stream_export_zip(documents, fmt="pdf", workers=4):
+    """Yield a ZIP archive of ``documents`` chunk by chunk.
+
+    PDFs render ahead in parallel, but at most ``2 * workers`` entries are in
+    flight, so memory stays flat however many documents are exported.
+    """
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, mode="w")
+    want_pdf = fmt in ("pdf", "both")
+    want_txt = fmt in ("txt", "both")
+    window = max(1, workers) * 2
+
+    def write_entry(doc, pdf_future):
+        base = _entry_base(doc)
+        text = doc["generatedText"]
+        if want_txt:
+            archive.writestr(_zip_info(f"{base}.txt", doc, compress=True), text)
+            yield sink.drain()
+        if want_pdf:
+            with _open_pdf(text, pdf_future) as src, \
+                    archive.open(_zip_info(f"{base}.pdf", doc, compress=False), "w") as dest:
+                while True:
+                    block = src.read(COPY_CHUNK)
+                    if not block:
+                        break
+                    dest.write(block)
+                    yield sink.drain()
+            yield sink.drain()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="export-render") as pool:
+        pending = deque()
+        for doc in documents:
+            future = _pdf_future(doc["generatedText"], pool) if want_pdf else None
+            pending.append((doc, future))
+            if len(pending) >= window:
+                yield from write_entry(*pending.popleft())
+        while pending:
+            yield from write_entry(*pending.popleft())
+
+    archive.close()
+    yield sink.drain()
@@ -0,0 +1,349 @@
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+# Raised by a handler when retrying cannot help (bad input, missing document)
+class PermanentJobError(Exception):
+    pass
+
+
+# on_failure(job, error) runs once, when the job has failed for good
+def job_handler(kind, on_failure=None):
+    def register(fn):
+        JOB_HANDLERS[kind] = (fn, on_failure)
+        return fn
+    return register
+
+
+class _JobQueue:
+    def __init__(self, lease_seconds=60, max_attempts=3,
+                 retry_base_delay=2.0, retry_max_delay=60.0):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+    def _new_job(self, kind, payload, user_id, doc_id):
+        now = datetime.now()
+        return {
+            "_id": ObjectId(),
+            "kind": kind,
+            "payload": payload,
+            "user_id": user_id,
+            "doc_id": doc_id,
+            "status": "queued",
+            "attempts": 0,
+            "maxAttempts": self.max_attempts,
+            "runAt": now,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+    def _retry_at(self, attempts):
+        # Full jitter, as in LLMClient: failed jobs from many workers spread out
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempts - 1)))
+        return datetime.now() + timedelta(seconds=random.uniform(0, cap))
+
+    def complete(self, job):
+        return self._finish(job, {"status": "completed", "finishedAt": datetime.now(), "error": None})
+
+    # Returns the new status, or None when a newer attempt holds the job
+    def fail(self, job, error, retry=True):
+        if retry and job["attempts"] < job["maxAttempts"]:
+            fields = {"status": "queued", "runAt": self._retry_at(job["attempts"]), "error": error}
+        else:
+            fields = {"status": "failed", "finishedAt": datetime.now(), "error": error}
+        if not self._finish(job, fields):
+            return None
+        return fields["status"]
+
+    def wait_for_work(self, timeout):
+        time.sleep(timeout)
+
+
+# ---------- MONGO QUEUE ----------
+# Leased claims: a dead worker's job is picked up once its lease runs out, and
+# completion is fenced on (worker, attempts) so a stale worker cannot overwrite it
+class MongoJobQueue(_JobQueue):
+    def __init__(self, collection, **kwargs):
+        super().__init__(**kwargs)
+        self.collection = collection
+
+    def enqueue(self, kind, payload, user_id=None, doc_id=None):
+        job = self._new_job(kind, payload, user_id, doc_id)
+        self.collection.insert_one(job)
+        return job["_id"]
+
+    def claim(self, worker_id):
+        now = datetime.now()
+        return self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "runAt": {"$lte": now}},
+                {"status": "running", "leaseUntil": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker": worker_id,
+                    "leaseUntil": now + timedelta(seconds=self.lease_seconds),
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("runAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _finish(self, job, fields):
+        result = self.collection.update_one(
+            {"_id": job["_id"], "worker": job["worker"], "attempts": job["attempts"]},
+            {"$set": {**fields, "updatedAt": datetime.now()}, "$unset": {"leaseUntil": ""}},
+        )
+        return result.modified_count == 1
+
+    def get(self, job_id):
+        return self.collection.find_one({"_id": job_id})
+
+
+# ---------- LOCAL QUEUE ----------
+# Single-process only: jobs are lost on restart, and only the last
+# max_finished finished jobs stay visible to /jobs/<id>
+class LocalJobQueue(_JobQueue):
+    def __init__(self, max_finished=1000, **kwargs):
+        super().__init__(**kwargs)
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._finished = OrderedDict()
+        self._cond = threading.Condition()
+
+    def enqueue(self, kind, payload, user_id=None, doc_id=None):
+        job = self._new_job(kind, payload, user_id, doc_id)
+        with self._cond:
+            self._jobs[job["_id"]] = job
+            self._cond.notify()
+        return job["_id"]
+
+    def claim(self, worker_id):
+        now = datetime.now()
+        with self._cond:
+            for job in self._jobs.values():
+                ready = job["status"] == "queued" and job["runAt"] <= now
+                expired = job["status"] == "running" and job["leaseUntil"] < now
+                if ready or expired:
+                    job.update(
+                        status="running",
+                        worker=worker_id,
+                        leaseUntil=now + timedelta(seconds=self.lease_seconds),
+                        updatedAt=now,
+                        attempts=job["attempts"] + 1,
+                    )
+                    return dict(job)
+        return None
+
+    def _finish(self, job, fields):
+        with self._cond:
+            current = self._jobs.get(job["_id"])
+            if current is None or (current["worker"], current["attempts"]) != (job["worker"], job["attempts"]):
+                return False
+            current.update(fields, updatedAt=datetime.now())
+            current.pop("leaseUntil", None)
+            if current["status"] in ("completed", "failed"):
+                self._finished[job["_id"]] = self._jobs.pop(job["_id"])
+                while len(self._finished) > self.max_finished:
+                    self._finished.popitem(last=False)
+            else:
+                self._cond.notify()
+            return True
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id) or self._finished.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_work(self, timeout):
+        # Woken straight away by enqueue instead of sleeping out the poll interval
+        with self._cond:
+            self._cond.wait(timeout)
+
+
+# ---------- WORKER ----------
+def fail_job(queue, job, error, retry=True):
+    status = queue.fail(job, error, retry=retry)
+    _, on_failure = JOB_HANDLERS.get(job["kind"], (None, None))
+    if status == "failed" and on_failure is not None:
+        try:
+            on_failure(job, error)
+        except Exception:
+            logger.exception("Failure hook for job %s raised", job["_id"])
+    return status
+
+
+def process_job(queue, job):
+    handler, _ = JOB_HANDLERS.get(job["kind"], (None, None))
+    if handler is None:
+        fail_job(queue, job, f"No handler for job kind {job['kind']!r}", retry=False)
+        return
+
+    try:
+        handler(job["payload"])
+    except Exception as exc:
+        retry = not isinstance(exc, PermanentJobError)
+        if retry:
+            logger.exception("Job %s (%s) attempt %s failed", job["_id"], job["kind"], job["attempts"])
+        fail_job(queue, job, str(exc) or exc.__class__.__name__, retry=retry)
+        return
+
+    queue.complete(job)
+
+
+# Idle polling backs off to max_poll_interval so a quiet queue stays cheap
+def run_worker(queue, stop_event, poll_interval=0.2, max_poll_interval=2.0):
+    worker_id = f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:6]}"
+    idle = poll_interval
+    while not stop_event.is_set():
+        try:
+            job = queue.claim(worker_id)
+        except Exception:
+            logger.exception("Job claim failed")
+            job = None
+
+        if job is None:
+            queue.wait_for_work(idle)
+            idle = min(max_poll_interval, idle * 2)
+            continue
+
+        idle = poll_interval
+        if job["attempts"] > job["maxAttempts"]:
+            # Lease ran out repeatedly (worker crashes); stop trying
+            fail_job(queue, job, "Job lease expired too many times", retry=False)
+            continue
+        process_job(queue, job)
+
+
+def start_worker_threads(queue, count, poll_interval=0.2, max_poll_interval=2.0):
+    stop_event = threading.Event()
+    for i in range(count):
+        threading.Thread(
+            target=run_worker,
+            args=(queue, stop_event, poll_interval, max_poll_interval),
+            name=f"job-worker-{i}",
+            daemon=True,
+        ).start()
+    return stop_event
+
+
+# ---------- MODULE API ----------
+_queue = None
+_worker_count = 0
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def init_job_queue(app, db):
+    global _queue, _worker_count
+    options = dict(
+        lease_seconds=app.config.get("JOB_LEASE_SECONDS", 60),
+        max_attempts=app.config.get("JOB_MAX_ATTEMPTS", 3),
+        retry_base_delay=app.config.get("JOB_RETRY_BASE_DELAY", 2.0),
+        retry_max_delay=app.config.get("JOB_RETRY_MAX_DELAY", 60.0),
+    )
+    if app.config.get("JOB_QUEUE_BACKEND", "local") == "mongo":
+        _queue = MongoJobQueue(db["jobs"], **options)
+    else:
+        _queue = LocalJobQueue(**options)
+        if app.config.get("JOB_QUEUE_ENABLED", False):
+            logger.warning(
+                "JOB_QUEUE_ENABLED with the local backend: jobs are only visible to "
+                "the worker that queued them and are lost on restart. Run a single "
+                "worker or set JOB_QUEUE_BACKEND=mongo."
+            )
+    _worker_count = app.config.get("JOB_WORKERS", 2)
+
+
+def get_job_queue():
+    return _queue
+
+
+def _ensure_workers():
+    # Started lazily, once per process: threads do not survive a fork
+    global _worker_pid
+    if _worker_pid == os.getpid() or _worker_count <= 0:
+        return
+    with _worker_lock:
+        if _worker_pid != os.getpid():
+            start_worker_threads(_queue, _worker_count)
+            _worker_pid = os.getpid()
+
+
+def enqueue_job(kind, payload, user_id=None, doc_id=None):
+    if _queue is None:
+        raise RuntimeError("Job queue not initialized")
+    job_id = _queue.enqueue(kind, payload, user_id=user_id, doc_id=doc_id)
+    _ensure_workers()
+    return job_id
+
+
+def get_job(job_id):
+    return _queue.get(job_id) if _queue is not None else None
+
+
+# ---------- CLI ----------
+def _run_workers(threads):
+    stop_event = start_worker_threads(_queue, threads)
+    try:
+        while not stop_event.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        stop_event.set()
+
+
+def _worker_process(threads):
+    from app import create_app
+
+    create_app()
+    _run_workers(threads)
+
+
+def register_job_commands(app):
+    import click
+
+    @app.cli.command("jobs-worker")
+    @click.option("--processes", default=1, show_default=True, help="worker processes")
+    @click.option("--threads", default=2, show_default=True, help="worker threads per process")
+    def jobs_worker_command(processes, threads):
+        """Run background job workers (JOB_QUEUE_BACKEND=mongo)."""
+        if not isinstance(_queue, MongoJobQueue):
+            raise click.ClickException("Dedicated workers need JOB_QUEUE_BACKEND=mongo")
+
+        if processes <= 1:
+            print(f"Job worker {os.getpid()} running {threads} threads")
+            _run_workers(threads)
+            return
+
+        # spawn: each worker builds its own app and Mongo client
+        ctx = multiprocessing.get_context("spawn")
+        workers = [ctx.Process(target=_worker_process, args=(threads,)) for _ in range(processes)]
+        for p in workers:
+            p.start()
+        print(f"Started {processes} job worker processes x {threads} threads")
+        try:
+            for p in workers:
+                p.join()
+        except KeyboardInterrupt:
+            for p in workers:
+                p.terminate()
+
@@ -0,0 +1,267 @@
+import os
+import random
+import threading
+import time
+import hashlib
+
+import google.generativeai as genai
+
+from app.services.metrics import LLM_REQUEST_DURATION, LLM_FIRST_CHUNK, LLM_TOKENS
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - api_core ships with google-generativeai
+    google_exceptions = None
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    # A TimeoutError, so LLMClient retries it like Gemini's DeadlineExceeded
+    pass
+
+
+def _retryable_exceptions():
+    retryable = (ConnectionError, TimeoutError)
+    if google_exceptions is not None:
+        retryable += (
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.InternalServerError,
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+        )
+    return retryable
+
+
+RETRYABLE_EXCEPTIONS = _retryable_exceptions()
+
+
+# ---------- PROVIDERS ----------
+class LLMProvider:
+    name = "base"
+
+    def generate(self, prompt, timeout):
+        raise NotImplementedError
+
+    def stream(self, prompt, timeout):
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key, model_name):
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def _record_usage(self, usage):
+        if usage is None:
+            return
+        LLM_TOKENS.labels(self.name, "prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+        LLM_TOKENS.labels(self.name, "completion").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+    def generate(self, prompt, timeout):
+        response = self._model.generate_content(
+            prompt, request_options={"timeout": timeout}
+        )
+        self._record_usage(getattr(response, "usage_metadata", None))
+        return response.text
+
+    def stream(self, prompt, timeout):
+        response = self._model.generate_content(
+            prompt, stream=True, request_options={"timeout": timeout}
+        )
+        usage = None
+        for chunk in response:
+            # Running totals; the last chunk carries the final counts
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            try:
+                text = chunk.text
+            except ValueError:
+                # Gemini raises when a chunk carries no text parts (e.g. safety stop)
+                continue
+            if text:
+                yield text
+        self._record_usage(usage)
+
+
+# Offline provider for local runs and load tests: reply depends only on the prompt
+class StubProvider(LLMProvider):
+    name = "stub"
+
+    def __init__(self, first_chunk_delay=0.0, chunk_delay=0.0, chunk_words=8):
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_words = max(1, int(chunk_words))
+
+    def reply_for(self, prompt):
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        return (
+            f"[stub:{digest}] This is a simulated LexiMate reply. It is produced "
+            "locally so the backend can be exercised without calling Gemini."
+        )
+
+    def _chunks(self, prompt):
+        words = self.reply_for(prompt).split(" ")
+        for i in range(0, len(words), self.chunk_words):
+            piece = " ".join(words[i:i + self.chunk_words])
+            yield piece if i == 0 else " " + piece
+
+    def _sleep(self, delay, deadline):
+        if not delay:
+            return
+        if time.monotonic() + delay > deadline:
+            raise LLMTimeoutError("Stub provider exceeded its deadline")
+        time.sleep(delay)
+
+    def generate(self, prompt, timeout):
+        return "".join(self.stream(prompt, timeout))
+
+    def stream(self, prompt, timeout):
+        deadline = time.monotonic() + timeout
+        self._sleep(self.first_chunk_delay, deadline)
+        words = 0
+        for i, piece in enumerate(self._chunks(prompt)):
+            if i:
+                self._sleep(self.chunk_delay, deadline)
+            words += len(piece.split())
+            yield piece
+        # Word counts stand in for tokens
+        LLM_TOKENS.labels(self.name, "prompt").inc(len(prompt.split()))
+        LLM_TOKENS.labels(self.name, "completion").inc(words)
+
+
+# ---------- CLIENT ----------
+# Per-attempt timeout plus bounded, jittered retries around a provider
+class LLMClient:
+    def __init__(self, provider, timeout=30.0, max_retries=2,
+                 retry_base_delay=0.5, retry_max_delay=4.0):
+        self.provider = provider
+        self.timeout = timeout
+        self.max_retries = max(0, int(max_retries))
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+    def _backoff(self, attempt):
+        # "Full jitter": spread retries from many workers across the window
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        time.sleep(random.uniform(0, cap))
+
+    def generate(self, prompt):
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            text = self._generate(prompt)
+            outcome = "ok"
+            return text
+        finally:
+            LLM_REQUEST_DURATION.labels(self.provider.name, "generate", outcome).observe(
+                time.perf_counter() - t0
+            )
+
+    def _generate(self, prompt):
+        attempt = 0
+        while True:
+            try:
+                return self.provider.generate(prompt, self.timeout)
+            except RETRYABLE_EXCEPTIONS as e:
+                if attempt >= self.max_retries:
+                    raise LLMError(f"{self.provider.name} call failed: {e}") from e
+                self._backoff(attempt)
+                attempt += 1
+
+    def stream(self, prompt):
+        t0 = time.perf_counter()
+        outcome = "error"
+        first = True
+        try:
+            for text in self._stream(prompt):
+                if first:
+                    LLM_FIRST_CHUNK.labels(self.provider.name).observe(time.perf_counter() - t0)
+                    first = False
+                yield text
+            outcome = "ok"
+        except GeneratorExit:
+            # Client went away mid-stream
+            outcome = "cancelled"
+            raise
+        finally:
+            LLM_REQUEST_DURATION.labels(self.provider.name, "stream", outcome).observe(
+                time.perf_counter() - t0
+            )
+
+    def _stream(self, prompt):
+        # Retrying is only safe until the first chunk has reached the caller
+        attempt = 0
+        while True:
+            started = False
+            try:
+                for text in self.provider.stream(prompt, self.timeout):
+                    started = True
+                    yield text
+                return
+            except RETRYABLE_EXCEPTIONS as e:
+                if started or attempt >= self.max_retries:
+                    raise LLMError(f"{self.provider.name} stream failed: {e}") from e
+                self._backoff(attempt)
+                attempt += 1
+
+
+# ---------- PER-PROCESS REGISTRY ----------
+_settings = {}
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+def build_provider(settings):
+    name = settings.get("LLM_PROVIDER", "gemini")
+    if name == "stub":
+        return StubProvider(
+            first_chunk_delay=settings.get("LLM_STUB_FIRST_CHUNK_DELAY", 0.0),
+            chunk_delay=settings.get("LLM_STUB_CHUNK_DELAY", 0.0),
+        )
+    if name == "gemini":
+        return GeminiProvider(
+            api_key=settings.get("GEMINI_API_KEY"),
+            model_name=settings.get("LLM_MODEL", "gemini-2.5-flash"),
+        )
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def init_llm(app):
+    global _client, _client_pid
+    keys = (
+        "LLM_PROVIDER", "LLM_MODEL", "GEMINI_API_KEY", "LLM_TIMEOUT",
+        "LLM_MAX_RETRIES", "LLM_RETRY_BASE_DELAY", "LLM_RETRY_MAX_DELAY",
+        "LLM_STUB_FIRST_CHUNK_DELAY", "LLM_STUB_CHUNK_DELAY",
+    )
+    with _lock:
+        _settings.clear()
+        _settings.update({k: app.config.get(k) for k in keys if app.config.get(k) is not None})
+        _client = None
+        _client_pid = None
+
+
+def get_llm_client():
+    global _client, _client_pid
+    # Rebuild after fork: gRPC channels must not be shared across processes
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = LLMClient(
+                build_provider(_settings),
+                timeout=_settings.get("LLM_TIMEOUT", 30.0),
+                max_retries=_settings.get("LLM_MAX_RETRIES", 2),
+                retry_base_delay=_settings.get("LLM_RETRY_BASE_DELAY", 0.5),
+                retry_max_delay=_settings.get("LLM_RETRY_MAX_DELAY", 4.0),
+            )
+            _client_pid = pid
+    return _client
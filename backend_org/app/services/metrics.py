@@ -0,0 +1,258 @@
+import bisect
+import threading
+import time
+
+from pymongo import monitoring
+
+# Latency buckets in seconds: sub-millisecond Mongo reads up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ---------- METRIC TYPES ----------
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in sorted(children):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, values, child):
+        yield f"{self.name}{_label_str(self.labelnames, values)} {child.value}"
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, values, child):
+        counts, total = child.snapshot()
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            labels = _label_str(self.labelnames, values, 'le="%s"' % le)
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _label_str(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {total}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class CallbackMetric(_Metric):
+    # Read at scrape time from state another module already keeps;
+    # fn() returns {label values: number}
+    def __init__(self, name, documentation, kind, fn, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in sorted(self.fn().items()):
+            lines.append(f"{self.name}{_label_str(self.labelnames, values)} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Time to build the response, per blueprint route.",
+    ("blueprint", "route", "method", "status"),
+))
+MONGO_COMMAND_DURATION = REGISTRY.register(Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command round trips, per collection and command.",
+    ("collection", "command"),
+))
+MONGO_COMMAND_FAILURES = REGISTRY.register(Counter(
+    "mongo_command_failures_total",
+    "MongoDB commands that returned an error.",
+    ("collection", "command"),
+))
+LLM_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds",
+    "LLM calls including retries; for streams, until the last chunk.",
+    ("provider", "operation", "outcome"),
+))
+LLM_FIRST_CHUNK = REGISTRY.register(Histogram(
+    "llm_first_chunk_seconds",
+    "Time until a streamed LLM reply produced its first chunk.",
+    ("provider",),
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total",
+    "Tokens reported by the provider (estimated for the stub).",
+    ("provider", "kind"),
+))
+PDF_RENDER_DURATION = REGISTRY.register(Histogram(
+    "pdf_render_duration_seconds",
+    "ReportLab render time in this process (pool workers are not included).",
+    ("engine",),
+))
+PDF_RENDER_PAGES = REGISTRY.register(Counter(
+    "pdf_render_pages_total",
+    "Pages rendered in this process.",
+    ("engine",),
+))
+PDF_DOWNLOADS = REGISTRY.register(Counter(
+    "pdf_downloads_total",
+    "PDF downloads by where the file came from.",
+    ("source",),
+))
+
+
+def render_metrics():
+    return REGISTRY.render()
+
+
+# ---------- MONGO COMMAND MONITORING ----------
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command the client sends, labelled by collection."""
+
+    def __init__(self):
+        self._inflight = {}
+
+    @staticmethod
+    def _collection(event):
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        return target if isinstance(target, str) else "-"
+
+    def started(self, event):
+        # dict item assignment and pop are atomic under the GIL
+        self._inflight[event.request_id] = self._collection(event)
+
+    def succeeded(self, event):
+        collection = self._inflight.pop(event.request_id, "-")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        collection = self._inflight.pop(event.request_id, "-")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(
+            event.duration_micros / 1e6
+        )
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+# ---------- FLASK HOOKS ----------
+def init_metrics(app):
+    from flask import g, request
+
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            rule = request.url_rule
+            HTTP_REQUEST_DURATION.labels(
+                request.blueprint or "-",
+                # The rule, not the path, so /documents/<doc_id> is one series
+                rule.rule if rule is not None else "unmatched",
+                request.method,
+                response.status_code,
+            ).observe(time.perf_counter() - started)
+        return response
@@ -0,0 +1,122 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """Too many hashes queued; the caller should answer 503 instead of waiting."""
+
+
+# ---------- HASHER ----------
+class PasswordHasher:
+    """Runs the deliberately slow KDF on a bounded process pool.
+
+    Web threads only wait on a future, so hashing uses several cores despite
+    the GIL, and with ``workers`` below the core count the rest of the API
+    keeps CPU during a login burst. Once ``max_pending`` hashes are queued
+    further requests fail fast with HasherBusy.
+    """
+
+    def __init__(self, method, workers=2, max_pending=64, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self._pool = None
+        self._pool_pid = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            # spawn: forking a process that holds Mongo sockets and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pool_pid = pid
+            self._pending = 0
+        return self._pool
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn, *args):
+        if self.workers <= 0:
+            raise RuntimeError("PasswordHasher has no pool; call the function inline")
+        with self._lock:
+            pool = self._get_pool()
+            if self._pending >= self.max_pending:
+                raise HasherBusy()
+            self._pending += 1
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        # Werkzeug keeps the parameters in front: "scrypt:32768:8:1$salt$hash"
+        return stored_hash.split("$", 1)[0] != self.method
+
+    def rehash_async(self, password, on_done):
+        """Hash in the background and call ``on_done(new_hash)``; skipped when busy."""
+        if self.workers <= 0:
+            on_done(generate_password_hash(password, self.method))
+            return
+        try:
+            future = self.submit(generate_password_hash, password, self.method)
+        except HasherBusy:
+            return
+
+        def finish(f):
+            try:
+                on_done(f.result())
+            except Exception:
+                logger.exception("Password rehash failed")
+
+        future.add_done_callback(finish)
+
+
+# ---------- PER-PROCESS HASHER ----------
+_hasher = PasswordHasher("scrypt:32768:8:1", workers=0)
+
+
+def init_password_hasher(app):
+    global _hasher
+    _hasher = PasswordHasher(
+        app.config.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"),
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 2),
+        max_pending=app.config.get("PASSWORD_HASH_MAX_PENDING", 64),
+        timeout=app.config.get("PASSWORD_HASH_TIMEOUT", 10.0),
+    )
+
+
+def get_password_hasher():
+    return _hasher
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Part of every cache key: bump whenever the rendered output changes so
+# previously cached files are never served for the new layout.
+RENDER_SETTINGS_VERSION = "2"
+
+
+def pdf_cache_key(text, title=""):
+    h = hashlib.sha256()
+    for part in (RENDER_SETTINGS_VERSION, title or "", text or ""):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class PdfCache:
+    """Content-addressed PDF files under ``root`` with size-bounded LRU eviction.
+
+    Files are written to a temp file in the destination directory and moved
+    into place with os.replace, so concurrent workers never observe partial
+    PDFs; two workers rendering the same key just race to an identical file.
+    Hits refresh the file's mtime, which is what eviction orders by. Files
+    are never removed when a document changes: identical text from other
+    documents maps to the same key, so a superseded file just stops getting
+    hits and ages out.
+    """
+
+    def __init__(self, root, max_bytes=512 * 1024 * 1024, evict_every=20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_every = max(1, evict_every)
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.pdf")
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, render):
+        """Render into the cache with ``render(fileobj)`` and return the path."""
+        path = self.path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                render(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.evict_every == 0
+        if due:
+            self.evict()
+        return path
+
+    def evict(self):
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(".pdf"):
+                    continue
+                full = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(full)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, full))
+                total += st.st_size
+
+        if total <= self.max_bytes:
+            return 0
+
+        # Evict down to 90% so we are not back here on the very next write
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, full in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(full)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        logger.info("PDF cache evicted %d files", removed)
+        return removed
+
+
+# ---------- PER-PROCESS CACHE ----------
+_cache = None
+
+
+def init_pdf_cache(app):
+    global _cache
+    _cache = PdfCache(
+        app.config["PDF_DIR"],
+        max_bytes=app.config.get("PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024),
+    )
+
+
+def get_pdf_cache():
+    return _cache
@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+from app.services.metrics import PDF_RENDER_DURATION, PDF_RENDER_PAGES
+
+# Matches the Platypus defaults (SimpleDocTemplate margins, "Normal" style)
+PAGE_SIZE = A4
+MARGIN = 72
+BODY_FONT = "Helvetica"
+BODY_SIZE = 10
+BODY_LEADING = 12
+TITLE_FONT = "Helvetica-Bold"
+TITLE_SIZE = 18
+TITLE_LEADING = 22
+
+ENGINES = ("fast", "platypus")
+
+# Text using ReportLab paragraph markup needs the full Platypus engine
+_MARKUP_RE = re.compile(r"<\s*/?\s*(b|i|u|strike|br|font|para|super|sub|a|strong|em)\b", re.IGNORECASE)
+
+
+# ---------- FAST ENGINE ----------
+class FastTextEngine:
+    """Writes wrapped plain text straight onto a canvas.
+
+    Font metrics are cached per character for the life of the process, so
+    wrapping costs a dict lookup per character instead of a stringWidth call
+    per candidate line.
+    """
+
+    def __init__(self, font=BODY_FONT, size=BODY_SIZE, leading=BODY_LEADING):
+        self.font = font
+        self.size = size
+        self.leading = leading
+        self.page_width, self.page_height = PAGE_SIZE
+        self.max_width = self.page_width - 2 * MARGIN
+        self._widths = {}
+        self._lock = threading.Lock()
+
+    def _char_width(self, ch):
+        width = self._widths.get(ch)
+        if width is None:
+            width = stringWidth(ch, self.font, self.size)
+            with self._lock:
+                self._widths[ch] = width
+        return width
+
+    def _text_width(self, text):
+        return sum(self._char_width(ch) for ch in text)
+
+    def _split_word(self, word):
+        pieces = []
+        start = 0
+        width = 0.0
+        for i, ch in enumerate(word):
+            w = self._char_width(ch)
+            if i > start and width + w > self.max_width:
+                pieces.append(word[start:i])
+                start, width = i, 0.0
+            width += w
+        pieces.append(word[start:])
+        return pieces
+
+    def wrap(self, line):
+        if not line.strip():
+            return [""]
+
+        space = self._char_width(" ")
+        lines = []
+        current = []
+        width = 0.0
+        for word in line.split():
+            w = self._text_width(word)
+            if w > self.max_width:
+                # Long URL or clause id: break it across lines like Platypus does
+                if current:
+                    lines.append(" ".join(current))
+                pieces = self._split_word(word)
+                lines.extend(pieces[:-1])
+                word = pieces[-1]
+                current, width = [word], self._text_width(word)
+                continue
+            needed = w if not current else width + space + w
+            if current and needed > self.max_width:
+                lines.append(" ".join(current))
+                current, width = [word], w
+            else:
+                current.append(word)
+                width = needed
+        if current:
+            lines.append(" ".join(current))
+        return lines
+
+    def render(self, text, out, title=None):
+        pdf = canvas.Canvas(out, pagesize=PAGE_SIZE)
+        top = self.page_height - MARGIN
+        bottom = MARGIN
+        y = top
+
+        if title:
+            pdf.setFont(TITLE_FONT, TITLE_SIZE)
+            pdf.drawCentredString(self.page_width / 2, y - TITLE_SIZE, title)
+            y -= TITLE_LEADING + 12
+
+        body = pdf.beginText(MARGIN, y - self.size)
+        body.setFont(self.font, self.size, self.leading)
+        for raw in text.split("\n"):
+            for line in self.wrap(raw):
+                if y - self.leading < bottom:
+                    pdf.drawText(body)
+                    pdf.showPage()
+                    y = top
+                    body = pdf.beginText(MARGIN, y - self.size)
+                    body.setFont(self.font, self.size, self.leading)
+                body.textLine(line)
+                y -= self.leading
+        pdf.drawText(body)
+
+        pages = pdf.getPageNumber()
+        pdf.save()
+        return pages
+
+
+# ---------- PLATYPUS ENGINE ----------
+class PlatypusEngine:
+    """Full flowable layout for text that carries ReportLab markup."""
+
+    def __init__(self):
+        # getSampleStyleSheet() builds fresh style objects each call; do it once
+        styles = getSampleStyleSheet()
+        self.body_style = styles["Normal"]
+        self.title_style = styles["Title"]
+
+    def render(self, text, out, title=None, markup=True):
+        doc = SimpleDocTemplate(out, pagesize=PAGE_SIZE)
+        content = []
+        if title:
+            content.append(Paragraph(escape(title), self.title_style))
+            content.append(Spacer(1, 12))
+        for line in text.split("\n"):
+            content.append(Paragraph(line if markup else escape(line), self.body_style))
+        doc.build(content)
+        return doc.page
+
+
+# ---------- ENTRY POINT ----------
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name):
+    engine = _engines.get(name)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = FastTextEngine() if name == "fast" else PlatypusEngine()
+                _engines[name] = engine
+    return engine
+
+
+def choose_engine(text):
+    return "platypus" if _MARKUP_RE.search(text or "") else "fast"
+
+
+def render_pdf(text, out, title=None, engine="auto"):
+    """Render ``text`` as a PDF into the file object ``out``; returns the page count."""
+    text = text or ""
+    if engine == "auto":
+        engine = choose_engine(text)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
+    t0 = time.perf_counter()
+    pages = get_engine(engine).render(text, out, title=title)
+    PDF_RENDER_DURATION.labels(engine).observe(time.perf_counter() - t0)
+    PDF_RENDER_PAGES.labels(engine).inc(pages)
+    return pages
@@ -1,6 +1,19 @@
+import logging
+import os
+import threading
+import time
+
 from bson import ObjectId
 from datetime import datetime
+from pymongo.errors import PyMongoError
+
 import app.extensions as ext
+from app.services.watermark_service import bump_watermark
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PROJECTION = {"password": 0}
 
 
 def get_users_collection():
@@ -9,14 +22,96 @@ def get_users_collection():
     return ext.db["users"]
 
 
-# ---------- GET PROFILE BY USER ID ----------
-def get_user_profile(user_id):
-    users_collection = get_users_collection()
+# ---------- USER CACHE ----------
+# Projected user documents keyed by JWT identity, each stored with the
+# "profile" watermark version it was read under. Writes bump that version in
+# Mongo, so a caller that passes the current version never gets an entry
+# filled before another worker's write. Writes through this module (and
+# auth_service) also invalidate locally; callers without a version rely on
+# the optional change-stream watcher, or at worst the TTL.
+_user_cache = TTLCache(maxsize=10000, ttl=60)
+_watcher = None
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+_watch_enabled = False
 
-    return users_collection.find_one(
-        {"_id": ObjectId(user_id)},
-        {"password": 0},
+
+def init_user_cache(app):
+    global _user_cache, _watch_enabled
+    _user_cache = TTLCache(
+        maxsize=app.config.get("USER_CACHE_MAX_ENTRIES", 10000),
+        ttl=app.config.get("USER_CACHE_TTL", 60),
     )
+    _watch_enabled = app.config.get("USER_CACHE_INVALIDATION", "local") == "mongo"
+
+
+def invalidate_user(user_id):
+    _user_cache.delete(str(user_id))
+
+
+def user_cache_stats():
+    return {"entries": len(_user_cache), "hits": _user_cache.hits, "misses": _user_cache.misses}
+
+
+def _ensure_watcher():
+    # One watcher thread per process; threads do not survive a fork
+    global _watcher, _watcher_pid
+    if not _watch_enabled:
+        return
+    pid = os.getpid()
+    if _watcher_pid == pid and _watcher.is_alive():
+        return
+    with _watcher_lock:
+        if _watcher_pid != pid or not _watcher.is_alive():
+            _watcher = threading.Thread(target=_watch_users, name="user-cache-watch", daemon=True)
+            _watcher_pid = pid
+            _watcher.start()
+
+
+def _watch_users():
+    # Only ids cross the wire: any change to a user drops that cache entry
+    pipeline = [
+        {"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}},
+        {"$project": {"documentKey": 1}},
+    ]
+    resume_token = None
+    while True:
+        try:
+            with get_users_collection().watch(pipeline, resume_after=resume_token) as stream:
+                # Anything cached before the stream opened may already be stale
+                _user_cache.clear()
+                for change in stream:
+                    resume_token = stream.resume_token
+                    invalidate_user(change["documentKey"]["_id"])
+        except PyMongoError:
+            logger.exception("User change stream interrupted; reconnecting")
+            resume_token = None
+            time.sleep(1)
+
+
+# ---------- GET PROFILE BY USER ID ----------
+def get_user_profile(user_id, version=None):
+    """The user without password, from the per-process cache when possible.
+
+    ``version`` is the user's current "profile" watermark version (see
+    app.utils.conditional.current_watermark); a cached entry read under any
+    other version is treated as a miss. Read the version before calling, so
+    a fill racing with a write is tagged with the older one.
+
+    Returns a fresh dict each call, so callers may mutate it (e.g. to
+    stringify ``_id``) without touching the cached copy.
+    """
+    _ensure_watcher()
+    key = str(user_id)
+    cached = _user_cache.get(key)
+    if cached is not None and (version is None or cached[0] == version):
+        return dict(cached[1])
+
+    user = get_users_collection().find_one({"_id": ObjectId(user_id)}, PROFILE_PROJECTION)
+    if user is None:
+        return None
+    _user_cache.set(key, (version, user))
+    return dict(user)
 
 
 # ---------- UPDATE PROFILE BY USER ID ----------
@@ -29,8 +124,7 @@ def update_user_profile(user_id, update_fields):
             {"_id": ObjectId(user_id)},
             {"$set": update_fields},
         )
+        invalidate_user(user_id)
+        bump_watermark(user_id, "profile")
 
-    return users_collection.find_one(
-        {"_id": ObjectId(user_id)},
-        {"password": 0},
-    )
+    return get_user_profile(user_id)
@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import app.extensions as ext
+from app.services.pdf_cache import PdfCache, get_pdf_cache, pdf_cache_key
+from app.services.watermark_service import bump_watermark
+
+logger = logging.getLogger(__name__)
+
+
+def get_nda_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["nda_agreements"]
+
+
+# ---------- WORKER (runs in a child process) ----------
+def render_into_cache(cache_root, max_bytes, key, text):
+    from app.services.pdf_service import render_text_pdf
+
+    cache = PdfCache(cache_root, max_bytes=max_bytes)
+    existing = cache.get(key)
+    if existing:
+        return existing
+    return cache.put(key, lambda out: render_text_pdf(text, out))
+
+
+# ---------- SCHEDULER ----------
+class RenderScheduler:
+    """Pre-renders document PDFs into the PDF cache on a bounded process pool.
+
+    Requests are deduplicated by cache key, so a burst of saves of the same
+    text renders once. Progress is recorded on the document as
+    ``pdfRender = {status: queued|ready|failed, key, updatedAt}``.
+    """
+
+    def __init__(self, workers=2, max_pending=100):
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self._pool = None
+        self._pool_pid = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            # spawn: forking a process that holds Mongo sockets and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            self._pool_pid = pid
+            self._inflight = {}
+        return self._pool
+
+    def _set_state(self, doc_id, key, status, extra=None, only_if_key=False):
+        state = {"status": status, "key": key, "updatedAt": datetime.now()}
+        if extra:
+            state.update(extra)
+        query = {"_id": doc_id}
+        if only_if_key:
+            # A newer text may have been scheduled meanwhile; don't clobber it
+            query["pdfRender.key"] = key
+        update = {"$set": {"pdfRender": state}}
+        if status == "ready":
+            update["$set"]["pdfCacheKey"] = key
+
+        doc = get_nda_collection().find_one_and_update(query, update, projection={"user_id": 1})
+        if doc:
+            bump_watermark(doc.get("user_id"), "documents")
+
+    def submit(self, text):
+        """Render ``text`` into the cache on the pool; returns a future of the path.
+
+        Returns None when ``max_pending`` renders are already in flight and
+        this text is not one of them; callers then render elsewhere.
+        """
+        cache = get_pdf_cache()
+        key = pdf_cache_key(text)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                if len(self._inflight) >= self.max_pending:
+                    return None
+                future = self._get_pool().submit(
+                    render_into_cache, cache.root, cache.max_bytes, key, text
+                )
+                self._inflight[key] = future
+                future.add_done_callback(lambda f, key=key: self._forget(key))
+        return future
+
+    def inflight(self, key):
+        with self._lock:
+            return self._inflight.get(key)
+
+    def schedule(self, doc_id, text):
+        cache = get_pdf_cache()
+        if cache is None or not text:
+            return None
+
+        key = pdf_cache_key(text)
+        if cache.get(key):
+            self._set_state(doc_id, key, "ready")
+            return None
+
+        future = self.submit(text)
+        if future is None:
+            # Shed: the download path still renders on demand
+            logger.warning("PDF render queue full; skipping pre-render of %s", doc_id)
+            return None
+
+        self._set_state(doc_id, key, "queued")
+        future.add_done_callback(lambda f: self._on_done(doc_id, key, f))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _on_done(self, doc_id, key, future):
+        try:
+            future.result()
+        except Exception as e:
+            logger.exception("PDF pre-render failed for %s", doc_id)
+            self._set_state(doc_id, key, "failed", {"error": str(e)}, only_if_key=True)
+            return
+        self._set_state(doc_id, key, "ready", only_if_key=True)
+
+
+# ---------- PER-PROCESS SCHEDULER ----------
+_scheduler = None
+
+
+def init_render_scheduler(app):
+    global _scheduler
+    if not app.config.get("PDF_PRERENDER_ENABLED", True):
+        _scheduler = None
+        return
+    _scheduler = RenderScheduler(
+        workers=app.config.get("PDF_RENDER_WORKERS", 2),
+        max_pending=app.config.get("PDF_RENDER_MAX_PENDING", 100),
+    )
+
+
+def schedule_pdf_render(doc_id, text):
+    if _scheduler is None:
+        return None
+    try:
+        return _scheduler.schedule(doc_id, text)
+    except Exception:
+        # Pre-rendering is an optimisation; the download path can always render
+        logger.exception("Could not schedule PDF render for %s", doc_id)
+        return None
+
+
+def submit_pdf_render(text):
+    if _scheduler is None:
+        return None
+    return _scheduler.submit(text)
+
+
+def wait_for_render(key, timeout):
+    if _scheduler is None:
+        return None
+    future = _scheduler.inflight(key)
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return None
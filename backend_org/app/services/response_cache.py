@@ -0,0 +1,314 @@
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+
+from app.services.metrics import REGISTRY, CallbackMetric
+from app.utils.ttl_cache import TTLCache
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_SHINGLE_SIZE = 4
+# Dropped before shingling so "what is an NDA" and "what is a NDA" collide
+_FILLER_WORDS = frozenset({"a", "an", "the", "please", "can", "you", "me"})
+
+
+# ---------- NORMALIZATION ----------
+def normalize_prompt(prompt):
+    text = unicodedata.normalize("NFKC", prompt or "").lower()
+    text = _PUNCT_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def prompt_key(normalized):
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# Words that flip a legal answer while barely changing the text: near
+# duplicates must agree on all of them, in order ("can I sue my landlord"
+# and "can my landlord sue me" differ). "t" is what "don't" normalizes to.
+_NEGATIONS = frozenset({"not", "no", "never", "without", "nor", "neither", "none", "nothing", "cannot", "t"})
+_PARTIES = frozenset({
+    "i", "me", "my", "we", "us", "our", "you", "your", "he", "him", "his",
+    "she", "her", "they", "them", "their",
+    "employer", "employee", "landlord", "tenant", "lessor", "lessee",
+    "licensor", "licensee", "buyer", "seller", "vendor", "purchaser",
+    "contractor", "subcontractor", "client", "customer", "supplier",
+    "borrower", "lender", "creditor", "debtor", "plaintiff", "defendant",
+    "claimant", "respondent", "parent", "child", "spouse", "partner",
+    "company", "director", "shareholder", "owner", "agent", "principal",
+})
+
+
+def _guard(normalized):
+    # "2 years" and "3 years" shingle almost identically but need different answers
+    words = [
+        w for w in normalized.split(" ")
+        if w in _NEGATIONS or w in _PARTIES or _NUMBER_RE.fullmatch(w)
+    ]
+    return " ".join(words)
+
+
+# ---------- MINHASH ----------
+class MinHasher:
+    def __init__(self, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, normalized):
+        normalized = " ".join(w for w in normalized.split(" ") if w not in _FILLER_WORDS)
+        if len(normalized) <= _SHINGLE_SIZE:
+            shingles = {normalized}
+        else:
+            shingles = {
+                normalized[i:i + _SHINGLE_SIZE]
+                for i in range(len(normalized) - _SHINGLE_SIZE + 1)
+            }
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        ]
+
+    def band_keys(self, signature):
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(repr(rows).encode("ascii"), digest_size=8).hexdigest()
+            keys.append(f"{band}:{digest}")
+        return keys
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return same / len(sig_a)
+
+
+# ---------- RESPONSE CACHE ----------
+class _Entry:
+    __slots__ = ("reply", "signature", "bands", "guard")
+
+    def __init__(self, reply, signature, bands, guard):
+        self.reply = reply
+        self.signature = signature
+        self.bands = bands
+        self.guard = guard
+
+
+# Exact normalized-prompt hits only, unless near_duplicates turns on the
+# MinHash tier (still gated by _guard)
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=86400, near_duplicates=False,
+                 near_threshold=0.9, shared_collection=None):
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.near_threshold = near_threshold
+        self.shared = shared_collection
+        self.hasher = MinHasher()
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._forget_bands)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.counters = {"exact_hits": 0, "near_hits": 0, "shared_hits": 0, "misses": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _forget_bands(self, key, entry):
+        with self._lock:
+            # Re-putting a prompt replaces its entry under the same key and
+            # bands; the buckets still point at the live entry, so keep them
+            if key in self._entries:
+                return
+            for band in entry.bands:
+                keys = self._buckets.get(band)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._buckets[band]
+
+    def _remember(self, key, entry):
+        # set() first: it evicts any entry this one replaces, and that
+        # forget must not undo the buckets added below
+        self._entries.set(key, entry)
+        with self._lock:
+            for band in entry.bands:
+                self._buckets.setdefault(band, set()).add(key)
+
+    def _near_local(self, signature, bands, guard):
+        with self._lock:
+            candidates = set()
+            for band in bands:
+                candidates |= self._buckets.get(band, set())
+        best, best_score = None, self.near_threshold
+        for key in candidates:
+            entry = self._entries.get(key)
+            if entry is None or entry.guard != guard:
+                continue
+            score = self.hasher.similarity(signature, entry.signature)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def _shared_lookup(self, key, signature, bands, guard):
+        now = datetime.now()
+        doc = self.shared.find_one({"_id": key, "expiresAt": {"$gt": now}})
+        if doc or not self.near_duplicates:
+            return doc
+        best, best_score = None, self.near_threshold
+        for doc in self.shared.find(
+            {"bands": {"$in": bands}, "guard": guard, "expiresAt": {"$gt": now}},
+            {"reply": 1, "signature": 1, "bands": 1, "guard": 1},
+        ).limit(20):
+            score = self.hasher.similarity(signature, doc["signature"])
+            if score >= best_score:
+                best, best_score = doc, score
+        return best
+
+    def _describe(self, normalized):
+        if not self.near_duplicates:
+            # Exact keys only: skip MinHash, entries join no buckets
+            return None, [], ""
+        signature = self.hasher.signature(normalized)
+        return signature, self.hasher.band_keys(signature), _guard(normalized)
+
+    def get(self, prompt):
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+        key = prompt_key(normalized)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._count("exact_hits")
+            return entry.reply
+
+        signature, bands, guard = self._describe(normalized)
+
+        if self.near_duplicates:
+            entry = self._near_local(signature, bands, guard)
+            if entry is not None:
+                self._count("near_hits")
+                return entry.reply
+
+        if self.shared is not None:
+            try:
+                doc = self._shared_lookup(key, signature, bands, guard)
+            except Exception:
+                doc = None
+            if doc:
+                self._count("shared_hits")
+                self._remember(key, _Entry(doc["reply"], signature, bands, guard))
+                return doc["reply"]
+
+        self._count("misses")
+        return None
+
+    def put(self, prompt, reply):
+        normalized = normalize_prompt(prompt)
+        if not normalized or not reply:
+            return
+        key = prompt_key(normalized)
+        signature, bands, guard = self._describe(normalized)
+        self._remember(key, _Entry(reply, signature, bands, guard))
+
+        if self.shared is not None:
+            try:
+                self.shared.replace_one(
+                    {"_id": key},
+                    {
+                        "reply": reply,
+                        "signature": signature,
+                        "bands": bands,
+                        "guard": guard,
+                        "expiresAt": datetime.now() + timedelta(seconds=self.ttl),
+                    },
+                    upsert=True,
+                )
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["entries"] = len(self._entries)
+        return stats
+
+
+# ---------- PER-PROCESS INSTANCE ----------
+_cache = None
+
+
+def init_response_cache(app, db):
+    global _cache
+    if not app.config.get("RESPONSE_CACHE_ENABLED", True):
+        _cache = None
+        return
+
+    shared = None
+    if app.config.get("RESPONSE_CACHE_SHARED"):
+        # Indexes come from app.migrations (version 4)
+        shared = db["llm_response_cache"]
+
+    _cache = ResponseCache(
+        maxsize=app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024),
+        ttl=app.config.get("RESPONSE_CACHE_TTL", 86400),
+        near_duplicates=app.config.get("RESPONSE_CACHE_NEAR_DUPLICATES", False),
+        near_threshold=app.config.get("RESPONSE_CACHE_NEAR_THRESHOLD", 0.9),
+        shared_collection=shared,
+    )
+
+
+def get_response_cache():
+    return _cache
+
+
+# ---------- METRICS ----------
+_LOOKUP_RESULTS = {
+    "exact_hits": "exact_hit",
+    "near_hits": "near_hit",
+    "shared_hits": "shared_hit",
+    "misses": "miss",
+}
+
+
+def _lookup_counts():
+    if _cache is None:
+        return {}
+    stats = _cache.stats()
+    return {(result,): stats[name] for name, result in _LOOKUP_RESULTS.items()}
+
+
+def _entry_count():
+    return {} if _cache is None else {(): _cache.stats()["entries"]}
+
+
+REGISTRY.register(CallbackMetric(
+    "llm_response_cache_lookups_total",
+    "Response cache lookups in this process, by result.",
+    "counter",
+    _lookup_counts,
+    ("result",),
+))
+REGISTRY.register(CallbackMetric(
+    "llm_response_cache_entries",
+    "Replies held in this process's response cache.",
+    "gauge",
+    _entry_count,
+))
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+import app.extensions as ext
+from app.utils.cursor import encode_cursor, decode_cursor, keyset_filter
+
+# Tombstones older than this are purged by a TTL index (see app.migrations);
+# clients whose watermark predates it must resync from scratch.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# Writes stamped just before a sync started may commit just after it read,
+# so the returned watermark trails the read time by this much.
+CLOCK_SKEW = timedelta(seconds=2)
+
+SESSION_PROJECTION = {"title": 1, "createdAt": 1, "updatedAt": 1}
+
+
+def get_nda_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["nda_agreements"]
+
+
+def get_tombstones_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["tombstones"]
+
+
+def get_chat_sessions_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["chat_sessions"]
+
+
+# ---------- RECORD DELETION ----------
+def record_tombstone(user_id, kind, ref_id):
+    now = datetime.now()
+    get_tombstones_collection().insert_one({
+        "user_id": str(user_id),
+        "kind": kind,
+        "ref_id": str(ref_id),
+        "deletedAt": now,
+    })
+    return now
+
+
+# ---------- CHANGES SINCE ----------
+# Position of a sync in each collection: (timestamp, _id) of the last row
+# sent. Rows sharing one timestamp (a batch insert) are paged by _id, so a
+# truncated page always resumes after its last row instead of repeating it.
+SYNC_COLLECTIONS = ("documents", "chat_sessions", "deleted")
+
+# Sorts below every real _id, so (ts, MIN_OID) resumes at ts inclusive
+MIN_OID = ObjectId("0" * 24)
+
+
+def encode_sync_cursor(positions):
+    return ".".join(encode_cursor(*positions[name]) for name in SYNC_COLLECTIONS)
+
+
+def decode_sync_cursor(token):
+    """Return {collection: (datetime, ObjectId)}; raises ValueError if malformed."""
+    parts = token.split(".")
+    if len(parts) != len(SYNC_COLLECTIONS):
+        raise ValueError("Invalid cursor")
+    positions = dict(zip(SYNC_COLLECTIONS, (decode_cursor(p) for p in parts)))
+    if any(ts.tzinfo is not None for ts, _ in positions.values()):
+        raise ValueError("Invalid cursor")
+    return positions
+
+
+def _changed(collection, query, field, projection, limit):
+    rows = list(collection.find(query, projection).sort([(field, ASCENDING), ("_id", ASCENDING)]).limit(limit + 1))
+    truncated = len(rows) > limit
+    return rows[:limit], truncated
+
+
+def get_changes_since(user_id, since=None, after=None, include_text=False, limit=500):
+    """Return everything that changed for a user after ``since``.
+
+    ``since`` is the watermark of an earlier complete sync; ``after`` is the
+    per-collection cursor of a truncated one and takes precedence. With
+    neither, or when deletions since then may already be purged, the result
+    is a full snapshot and ``reset`` is True, telling the client to drop its
+    cache. Each collection is capped at ``limit`` rows; when any is
+    truncated, ``has_more`` is set and ``cursor`` resumes every collection
+    where this call stopped.
+    """
+    started = datetime.now()
+    if after is None and since is not None:
+        after = {name: (since, MIN_OID) for name in SYNC_COLLECTIONS}
+    # Only tombstones expire; a snapshot paging through old documents is fine
+    reset = after is None or after["deleted"][0] < started - TOMBSTONE_RETENTION
+
+    def window(name, field):
+        query = {"user_id": user_id}
+        if not reset:
+            query.update(keyset_filter(field, *after[name], descending=False))
+        return query
+
+    doc_projection = {"pdfCacheKey": 0} if include_text else {"generatedText": 0, "pdfCacheKey": 0}
+
+    documents, docs_cut = _changed(
+        get_nda_collection(), window("documents", "updatedAt"), "updatedAt", doc_projection, limit
+    )
+    sessions, sessions_cut = _changed(
+        get_chat_sessions_collection(), window("chat_sessions", "updatedAt"), "updatedAt",
+        SESSION_PROJECTION, limit,
+    )
+    deleted = []
+    deleted_cut = False
+    if not reset:
+        deleted, deleted_cut = _changed(
+            get_tombstones_collection(), window("deleted", "deletedAt"), "deletedAt",
+            {"kind": 1, "ref_id": 1, "deletedAt": 1}, limit,
+        )
+
+    # A collection that was not cut is caught up to the read time
+    caught_up = (started - CLOCK_SKEW, MIN_OID)
+    positions = {}
+    for name, rows, cut, field in (
+        ("documents", documents, docs_cut, "updatedAt"),
+        ("chat_sessions", sessions, sessions_cut, "updatedAt"),
+        ("deleted", deleted, deleted_cut, "deletedAt"),
+    ):
+        positions[name] = (rows[-1][field], rows[-1]["_id"]) if cut else caught_up
+
+    has_more = docs_cut or sessions_cut or deleted_cut
+    return {
+        "documents": documents,
+        "chat_sessions": sessions,
+        "deleted": deleted,
+        "watermark": min(ts for ts, _ in positions.values()),
+        "cursor": encode_sync_cursor(positions) if has_more else None,
+        "reset": reset,
+        "has_more": has_more,
+    }
@@ -0,0 +1,195 @@
+import logging
+import os
+import re
+from string import Formatter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "document_templates")
+
+# <type>@<version>.txt, e.g. nda@2.txt
+TEMPLATE_FILE = re.compile(r"^(?P<type>[a-z0-9_-]+)@(?P<version>\d+)\.txt$")
+# {>name} pulls in partials/<name>.txt
+PARTIAL_TAG = re.compile(r"\{>\s*([a-z0-9_-]+)\s*\}")
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+SCALAR_TYPES = (str, int, float, bool)
+
+
+class TemplateError(Exception):
+    """A template file is malformed; raised while loading."""
+
+
+class TemplateValidationError(ValueError):
+    def __init__(self, errors):
+        super().__init__("Invalid document fields")
+        self.errors = errors
+
+
+class _Fields(dict):
+    # Optional fields left out render as "None", like the old data.get() f-strings
+    def __missing__(self, key):
+        return None
+
+
+# ---------- COMPILED TEMPLATE ----------
+class DocumentTemplate:
+    """One version of one document type, parsed once at load time."""
+
+    def __init__(self, doc_type, version, body, title=None, required=()):
+        self.doc_type = doc_type
+        self.version = version
+        self.title = title or doc_type
+        self.fields = _field_names(body, f"{doc_type}@{version}")
+        self.required = tuple(required)
+        unknown = set(self.required) - self.fields
+        if unknown:
+            raise TemplateError(
+                f"{doc_type}@{version}: required fields not in template: {sorted(unknown)}"
+            )
+        # Partials are inlined once at load; str.format_map still parses the
+        # body on every call, but does the parsing and substitution in C
+        self._format = body.format_map
+
+    def validate(self, data):
+        errors = {}
+        for name in self.required:
+            value = data.get(name)
+            # The frontend sends "" for untouched inputs
+            if value is None or (isinstance(value, str) and not value.strip()):
+                errors[name] = "required"
+        for name in self.fields:
+            value = data.get(name)
+            if value is not None and not isinstance(value, SCALAR_TYPES):
+                errors[name] = "must be a string or number"
+        if errors:
+            raise TemplateValidationError(errors)
+
+    def render(self, data):
+        self.validate(data)
+        return self._format(_Fields(data))
+
+
+def _field_names(body, label):
+    names = set()
+    try:
+        for _, name, spec, conversion in Formatter().parse(body):
+            if name is None:
+                continue
+            if not FIELD_NAME.match(name) or spec or conversion:
+                # Plain {field} only: no attribute/index lookups or format specs
+                raise TemplateError(f"{label}: unsupported placeholder {{{name}}}")
+            names.add(name)
+    except ValueError as exc:
+        raise TemplateError(f"{label}: {exc}") from exc
+    return frozenset(names)
+
+
+# ---------- LOADING ----------
+def _split_front_matter(text):
+    """Split an optional ``---`` header of ``key: value`` lines from the body."""
+    meta = {}
+    if not text.startswith("---\n"):
+        return meta, text
+    end = text.find("\n---\n", 3)
+    if end == -1:
+        raise TemplateError("unterminated front matter")
+    for line in text[4:end].splitlines():
+        if line.strip():
+            key, _, value = line.partition(":")
+            meta[key.strip()] = value.strip()
+    return meta, text[end + 5:]
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _expand_partials(body, partials, label, stack=()):
+    def replace(match):
+        name = match.group(1)
+        if name not in partials:
+            raise TemplateError(f"{label}: unknown partial {name!r}")
+        if name in stack:
+            raise TemplateError(f"{label}: partial cycle {' -> '.join(stack + (name,))}")
+        return _expand_partials(partials[name], partials, label, stack + (name,))
+
+    return PARTIAL_TAG.sub(replace, body)
+
+
+class TemplateRegistry:
+    """Document templates keyed by type and version.
+
+    Lookups are plain dict hits; all parsing, partial expansion and checks
+    happen once in ``load``.
+    """
+
+    def __init__(self, templates=()):
+        self._versions = {}
+        self._latest = {}
+        for template in templates:
+            self._versions[(template.doc_type, template.version)] = template
+            current = self._latest.get(template.doc_type)
+            if current is None or template.version > current.version:
+                self._latest[template.doc_type] = template
+
+    @classmethod
+    def load(cls, directory):
+        partial_dir = os.path.join(directory, "partials")
+        partials = {}
+        if os.path.isdir(partial_dir):
+            for name in os.listdir(partial_dir):
+                if name.endswith(".txt"):
+                    # Trailing newline dropped so a partial can sit inline
+                    partials[name[:-4]] = _read(os.path.join(partial_dir, name)).rstrip("\n")
+
+        templates = []
+        for name in sorted(os.listdir(directory)):
+            match = TEMPLATE_FILE.match(name)
+            if not match:
+                continue
+            doc_type, version = match.group("type"), int(match.group("version"))
+            label = f"{doc_type}@{version}"
+            try:
+                meta, body = _split_front_matter(_read(os.path.join(directory, name)))
+            except TemplateError as exc:
+                raise TemplateError(f"{label}: {exc}") from exc
+            required = [f.strip() for f in meta.get("required", "").split(",") if f.strip()]
+            templates.append(DocumentTemplate(
+                doc_type,
+                version,
+                _expand_partials(body, partials, label),
+                title=meta.get("title"),
+                required=required,
+            ))
+
+        logger.info("Loaded %d document templates from %s", len(templates), directory)
+        return cls(templates)
+
+    def has(self, doc_type):
+        return doc_type in self._latest
+
+    def get(self, doc_type, version=None):
+        if version is None:
+            return self._latest.get(doc_type)
+        return self._versions.get((doc_type, version))
+
+    def types(self):
+        return sorted(self._latest)
+
+
+# ---------- MODULE API ----------
+_registry = None
+
+
+def init_templates(app):
+    global _registry
+    _registry = TemplateRegistry.load(app.config.get("DOCUMENT_TEMPLATE_DIR") or DEFAULT_TEMPLATE_DIR)
+
+
+def get_template_registry():
+    global _registry
+    if _registry is None:
+        # Scripts and benchmarks that never built the app
+        _registry = TemplateRegistry.load(DEFAULT_TEMPLATE_DIR)
+    return _registry
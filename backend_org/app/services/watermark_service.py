@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+import app.extensions as ext
+
+# One document per user: {_id: user_id, <scope>: last change time, <scope>_v: counter}
+SCOPES = ("documents", "chats", "profile")
+
+
+def get_watermarks_collection():
+    if ext.db is None:
+        raise RuntimeError("MongoDB not initialized")
+    return ext.db["watermarks"]
+
+
+def bump_watermark(user_id, *scopes):
+    if not user_id or not scopes:
+        return
+    now = datetime.now(timezone.utc)
+    get_watermarks_collection().update_one(
+        {"_id": str(user_id)},
+        {
+            "$max": {scope: now for scope in scopes},
+            # The counter keeps ETags moving even if worker clocks disagree
+            "$inc": {f"{scope}_v": 1 for scope in scopes},
+        },
+        upsert=True,
+    )
+
+
+def get_watermark(user_id, scope):
+    """Return (version, changed_at) for a user's scope, creating it if missing."""
+    watermarks = get_watermarks_collection()
+    doc = watermarks.find_one({"_id": str(user_id)}, {scope: 1, f"{scope}_v": 1})
+
+    if not doc or scope not in doc:
+        # Users created before watermarks existed: start tracking from now
+        bump_watermark(user_id, scope)
+        doc = watermarks.find_one({"_id": str(user_id)}, {scope: 1, f"{scope}_v": 1})
+
+    changed_at = doc[scope]
+    if changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    return doc.get(f"{scope}_v", 0), changed_at
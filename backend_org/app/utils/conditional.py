@@ -0,0 +1,61 @@
+import hashlib
+from functools import wraps
+
+from flask import g, request, make_response
+from flask_jwt_extended import get_jwt_identity
+
+from app.services.watermark_service import get_watermark
+
+
+def _etag_for(user_id, scope, version, changed_at):
+    raw = f"{user_id}|{scope}|{version}|{changed_at.isoformat()}|{request.full_path}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _not_modified(etag, changed_at):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return changed_at.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def current_watermark(scope):
+    """Version of ``scope`` that @conditional read for this request, or None.
+
+    It was read before the view ran, so data tagged with it is never newer
+    than the ETag the response carries.
+    """
+    return g.get("watermarks", {}).get(scope)
+
+
+def conditional(scope):
+    """Answer 304 for unchanged data using the user's per-scope watermark.
+
+    Must sit below @jwt_required(). Only one small read by _id happens
+    before deciding; the view itself runs only when the data changed.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = get_jwt_identity()
+            version, changed_at = get_watermark(user_id, scope)
+            etag = _etag_for(user_id, scope, version, changed_at)
+            g.setdefault("watermarks", {})[scope] = version
+
+            if _not_modified(etag, changed_at):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = changed_at
+            response.headers["Cache-Control"] = "private, no-cache"
+            response.vary.add("Authorization")
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,30 @@
+import base64
+from datetime import datetime
+
+from bson import ObjectId
+
+
+def encode_cursor(sort_value, oid):
+    raw = f"{sort_value.isoformat()}|{oid}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (datetime, ObjectId) for a cursor token; raises ValueError if malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        sort_raw, oid_raw = raw.split("|", 1)
+        return datetime.fromisoformat(sort_raw), ObjectId(oid_raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(field, sort_value, oid, descending=True):
+    op = "$lt" if descending else "$gt"
+    return {
+        "$or": [
+            {field: {op: sort_value}},
+            {field: sort_value, "_id": {op: oid}},
+        ]
+    }
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+
+def serialize_document(doc):
+    doc["_id"] = str(doc["_id"])
+    for k in ("createdAt", "updatedAt"):
+        if isinstance(doc.get(k), datetime):
+            doc[k] = doc[k].isoformat()
+    return doc
+
+
+def serialize_chat_session(chat):
+    return serialize_document(chat)
+
+
+def serialize_job(job):
+    out = {
+        "jobId": str(job["_id"]),
+        "kind": job.get("kind"),
+        "status": job.get("status"),
+        "attempts": job.get("attempts", 0),
+        "maxAttempts": job.get("maxAttempts"),
+        "error": job.get("error"),
+        "documentId": str(job["doc_id"]) if job.get("doc_id") else None,
+    }
+    for k in ("createdAt", "updatedAt", "finishedAt"):
+        out[k] = job[k].isoformat() if isinstance(job.get(k), datetime) else None
+    return out
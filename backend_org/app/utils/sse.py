@@ -0,0 +1,10 @@
+import json
+
+
+def format_sse(event, data):
+    payload = json.dumps(data, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def format_sse_comment(comment=""):
+    return f": {comment}\n\n"
@@ -0,0 +1,45 @@
+import re
+from html import escape
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def query_terms(q):
+    # Mongo $text treats "-word" as a negation; those must not be highlighted
+    terms = []
+    for raw in (q or "").split():
+        if raw.startswith("-"):
+            continue
+        terms += [t.lower() for t in _TERM_RE.findall(raw) if len(t) > 1]
+    return terms
+
+
+def make_snippet(text, terms, width=160):
+    """Return an HTML-escaped excerpt of ``text`` around the first matched term,
+    with every match wrapped in <mark>. Terms match as word prefixes, which
+    roughly mirrors the stemming done by the text index."""
+    text = " ".join((text or "").split())
+    if not text:
+        return ""
+    if not terms:
+        return escape(text[:width])
+
+    pattern = re.compile(r"\b(" + "|".join(re.escape(t) for t in terms) + r")\w*", re.IGNORECASE)
+    match = pattern.search(text)
+    center = match.start() if match else 0
+
+    start = max(0, center - width // 3)
+    end = min(len(text), start + width)
+    excerpt = text[start:end]
+
+    out = []
+    pos = 0
+    for m in pattern.finditer(excerpt):
+        out.append(escape(excerpt[pos:m.start()]))
+        out.append("<mark>" + escape(m.group(0)) + "</mark>")
+        pos = m.end()
+    out.append(escape(excerpt[pos:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    return prefix + "".join(out) + suffix
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``on_evict(key, value)`` is called (outside the lock) whenever an entry
+    leaves the cache through expiry, LRU pressure or explicit deletion.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0, on_evict=None):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _notify(self, evicted):
+        if self.on_evict:
+            for key, value in evicted:
+                self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        evicted = []
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                evicted.append((key, value))
+                self.misses += 1
+                value = default
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        self._notify(evicted)
+        return value
+
+    def set(self, key, value, ttl=None):
+        evicted = []
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._data:
+                old_value, _ = self._data.pop(key)
+                if old_value is not value:
+                    evicted.append((key, old_value))
+            self._data[key] = (value, expires_at)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._pop_oldest())
+        self._notify(evicted)
+
+    def _pop_oldest(self):
+        key, (value, _) = self._data.popitem(last=False)
+        return key, value
+
+    def delete(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+        if item is not None:
+            self._notify([(key, item[0])])
+        return item is not None
+
+    def clear(self):
+        with self._lock:
+            evicted = [(k, v) for k, (v, _) in self._data.items()]
+            self._data.clear()
+        self._notify(evicted)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[1] > time.monotonic()
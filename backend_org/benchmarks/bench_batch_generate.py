@@ -0,0 +1,96 @@
+"""Throughput of batch document generation in rows per second.
+
+Run from backend_org/:
+
+    python -m benchmarks.bench_batch_generate --rows 10000
+    python -m benchmarks.bench_batch_generate --rows 10000 --mongo-uri mongodb://localhost:27017
+
+Without --mongo-uri only template rendering is measured. With it, rows are
+also inserted through generate_documents_batch into a scratch database,
+which is cleaned up afterwards.
+"""
+import argparse
+import json
+import time
+
+import app.extensions as ext
+from app.services.document_service import build_generated_document, generate_documents_batch
+
+BENCH_USER = "bench-batch-generate"
+
+
+def sample_rows(count):
+    for i in range(count):
+        yield {
+            "effectiveDate": "2026-01-01",
+            "disclosingParty": "Leximate Ltd",
+            "receivingParty": f"Counterparty {i}",
+            "companyName": "Leximate Ltd",
+            "counterpartyName": f"Counterparty {i}",
+            "purpose": "Evaluation of a potential business relationship",
+            "confidentialityLevel": "High",
+            "duration": "2 years",
+            "additionalTerms": "None",
+        }
+
+
+def bench_render(rows):
+    started = time.perf_counter()
+    for data in sample_rows(rows):
+        build_generated_document(BENCH_USER, "nda", data)
+    return time.perf_counter() - started
+
+
+def bench_insert(rows, batch_size, mongo_uri, db_name):
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_uri)
+    ext.db = client[db_name]
+    try:
+        started = time.perf_counter()
+        failed = sum(
+            "error" in r
+            for r in generate_documents_batch(BENCH_USER, "nda", sample_rows(rows), batch_size=batch_size)
+        )
+        return time.perf_counter() - started, failed
+    finally:
+        ext.db["nda_agreements"].delete_many({"user_id": BENCH_USER})
+        ext.db["watermarks"].delete_many({"_id": BENCH_USER})
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--mongo-uri", help="also measure inserts against this MongoDB")
+    parser.add_argument("--db", default="leximate_bench", help="scratch database name")
+    args = parser.parse_args()
+
+    results = []
+    elapsed = bench_render(args.rows)
+    results.append({
+        "phase": "render",
+        "rows": args.rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(args.rows / elapsed, 1),
+    })
+
+    if args.mongo_uri:
+        elapsed, failed = bench_insert(args.rows, args.batch_size, args.mongo_uri, args.db)
+        results.append({
+            "phase": "render+insert",
+            "rows": args.rows,
+            "batch_size": args.batch_size,
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(args.rows / elapsed, 1),
+        })
+
+    for r in results:
+        print(f"{r['phase']:>14}: {r['rows_per_second']:>10} rows/s  ({r['seconds']} s for {r['rows']} rows)")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
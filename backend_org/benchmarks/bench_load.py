@@ -0,0 +1,397 @@
+"""Load test the API in-process and report throughput and p50/p95/p99 per route.
+
+Run from backend_org/:
+
+    python -m benchmarks.bench_load --mix all --seconds 30 --threads 8 --mongomock
+    python -m benchmarks.bench_load --mix dashboard --mongo-uri mongodb://localhost:27017/leximate_bench
+    python -m benchmarks.bench_load --compare benchmarks/results/a.json benchmarks/results/b.json
+
+The app is built with create_app() against a local MongoDB (--mongo-uri) or
+mongomock (--mongomock), with the stub LLM provider standing in for Gemini.
+Requests go through Flask's test client, so the numbers cover routing,
+controllers, services and the database, but not a WSGI server or network.
+Results are written as JSON under benchmarks/results/ for --compare.
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Scenario weights per mix; each scenario issues one or more requests
+MIXES = {
+    "dashboard": {"dashboard": 1},
+    "chat": {"chat_turn": 1},
+    "documents": {"list_documents": 3, "generate": 2, "download": 1},
+    "auth": {"login": 1},
+    "all": {"dashboard": 5, "list_documents": 2, "chat_turn": 2, "generate": 1, "download": 1, "login": 1},
+}
+
+PASSWORD = "bench-password-1"
+
+
+# ---------- APP UNDER TEST ----------
+def configure_env(args):
+    """Config reads the environment at import time, so this runs before importing app."""
+    env = {
+        "MONGO_URI": args.mongo_uri or "mongodb://localhost:27017/leximate_bench",
+        "LLM_PROVIDER": "stub",
+        "LLM_STUB_FIRST_CHUNK_DELAY": str(args.llm_latency),
+        "LLM_STUB_CHUNK_DELAY": str(args.llm_chunk_latency),
+        "JWT_SECRET_KEY": "bench-jwt-secret",
+        "FLASK_SECRET_KEY": "bench-secret",
+        "GOOGLE_OAUTH_CLIENT_ID": "bench",
+        "GOOGLE_OAUTH_CLIENT_SECRET": "bench",
+        "EVENT_BUS_BACKEND": "local",
+        "JOB_QUEUE_BACKEND": "local",
+        "USER_CACHE_INVALIDATION": "local",
+    }
+    if args.mongomock:
+        # mongomock has no text or partial-filter index support
+        env["MIGRATE_ON_STARTUP"] = "0"
+    os.environ.update(env)
+
+
+def build_app(args):
+    configure_env(args)
+    import app.extensions as ext
+
+    if args.mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("--mongomock needs `pip install mongomock`")
+        shared = mongomock.MongoClient()
+        ext.MongoClient = lambda *a, **kw: shared
+
+    from app import create_app
+    from app.services.pdf_cache import init_pdf_cache
+
+    app = create_app()
+    app.config["TESTING"] = True
+
+    # Rendered PDFs and uploads go to a scratch directory, not the working tree
+    scratch = tempfile.mkdtemp(prefix="leximate-bench-")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    for name, sub in (("PDF_DIR", "pdfs"), ("UPLOAD_FOLDER", "uploads")):
+        app.config[name] = os.path.join(scratch, sub)
+        os.makedirs(app.config[name])
+    init_pdf_cache(app)
+    return app
+
+
+# ---------- RECORDING ----------
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, client, route, method, url, **kwargs):
+        t0 = time.perf_counter()
+        response = client.open(url, method=method, **kwargs)
+        body = response.get_data()  # drains streamed responses
+        elapsed = time.perf_counter() - t0
+        self.samples[route].append(elapsed)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response, body
+
+    def merge(self, other):
+        for route, values in other.samples.items():
+            self.samples[route].extend(values)
+        for route, count in other.errors.items():
+            self.errors[route] += count
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    # Nearest rank: the smallest sample with at least p% of samples at or below it
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(recorder, seconds):
+    routes = {}
+    for route, values in sorted(recorder.samples.items()):
+        ordered = sorted(values)
+        routes[route] = {
+            "count": len(ordered),
+            "errors": recorder.errors.get(route, 0),
+            "rps": round(len(ordered) / seconds, 2),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+    total = sum(r["count"] for r in routes.values())
+    return routes, {
+        "requests": total,
+        "errors": sum(r["errors"] for r in routes.values()),
+        "rps": round(total / seconds, 2),
+    }
+
+
+# ---------- SCENARIOS ----------
+def auth_header(user):
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+def nda_payload():
+    return {
+        "documentType": "nda",
+        "companyName": "Leximate Ltd",
+        "counterpartyName": "Bench Counterparty",
+        "disclosingParty": "Leximate Ltd",
+        "receivingParty": "Bench Counterparty",
+        "effectiveDate": "2026-01-01",
+        "purpose": "Evaluation of a potential business relationship",
+        "confidentialityLevel": "High",
+        "duration": "2 years",
+        "governingLaw": "England and Wales",
+        "additionalTerms": "None",
+        "generateNow": True,
+    }
+
+
+def wait_for_job(rec, client, user, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response, _ = rec.call(client, "GET /jobs/<job_id>", "GET", f"/jobs/{job_id}", headers=auth_header(user))
+        status = (response.get_json() or {}).get("job", {}).get("status")
+        if status in ("completed", "failed"):
+            return status
+        time.sleep(0.05)
+    return "timeout"
+
+
+def scenario_dashboard(rec, client, user, rng):
+    headers = auth_header(user)
+    rec.call(client, "GET /api/me", "GET", "/api/me", headers=headers)
+    rec.call(client, "GET /getProfile", "GET", "/getProfile", headers=headers)
+    rec.call(client, "GET /documents/stats", "GET", "/documents/stats", headers=headers)
+    rec.call(client, "GET /documents?shape=summary", "GET", "/documents?shape=summary&limit=3", headers=headers)
+    rec.call(client, "GET /chatHistory", "GET", "/chatHistory", headers=headers)
+
+
+def scenario_list_documents(rec, client, user, rng):
+    headers = auth_header(user)
+    rec.call(client, "GET /documents", "GET", "/documents?limit=20", headers=headers)
+    rec.call(client, "GET /documents/<doc_id>", "GET", f"/documents/{rng.choice(user['documents'])}", headers=headers)
+
+
+def scenario_chat_turn(rec, client, user, rng):
+    headers = auth_header(user)
+    message = f"What should a mutual NDA say about term number {rng.randint(1, 50)}?"
+    rec.call(client, "POST /chat", "POST", "/chat",
+             json={"message": message, "session_id": user["session_id"]}, headers=headers)
+    rec.call(client, "GET /getMessages/<session_id>", "GET",
+             f"/getMessages/{user['session_id']}?limit=50", headers=headers)
+
+
+def scenario_generate(rec, client, user, rng):
+    response, _ = rec.call(client, "POST /generate-document", "POST", "/generate-document",
+                           json=nda_payload(), headers=auth_header(user))
+    job_id = (response.get_json() or {}).get("jobId")
+    if job_id:
+        wait_for_job(rec, client, user, job_id)
+
+
+def scenario_download(rec, client, user, rng):
+    rec.call(client, "GET /download-document/<doc_id>", "GET",
+             f"/download-document/{rng.choice(user['documents'])}", headers=auth_header(user))
+
+
+def scenario_login(rec, client, user, rng):
+    rec.call(client, "POST /login", "POST", "/login",
+             json={"email": user["email"], "password": PASSWORD})
+
+
+SCENARIOS = {
+    "dashboard": scenario_dashboard,
+    "list_documents": scenario_list_documents,
+    "chat_turn": scenario_chat_turn,
+    "generate": scenario_generate,
+    "download": scenario_download,
+    "login": scenario_login,
+}
+
+
+# ---------- SETUP ----------
+def seed_users(app, count, documents_per_user):
+    """Sign up users, open a chat session each and generate a few documents."""
+    client = app.test_client()
+    setup = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    users = []
+    for i in range(count):
+        email = f"bench-{run_id}-{i}@example.com"
+        response, _ = setup.call(client, "signup", "POST", "/signup",
+                                 json={"username": f"bench{i}", "email": email, "password": PASSWORD})
+        if response.status_code != 201:
+            raise SystemExit(f"Signup failed ({response.status_code}): {response.get_data(as_text=True)}")
+        user = {"email": email, "token": response.get_json()["token"], "documents": []}
+
+        response, _ = setup.call(client, "startChat", "POST", "/startChat", headers=auth_header(user))
+        user["session_id"] = response.get_json()["session_id"]
+
+        for _ in range(documents_per_user):
+            response, _ = setup.call(client, "generate", "POST", "/generate-document",
+                                     json=nda_payload(), headers=auth_header(user))
+            data = response.get_json() or {}
+            if data.get("jobId"):
+                wait_for_job(setup, client, user, data["jobId"])
+            user["documents"].append(data["documentId"])
+        users.append(user)
+    return users
+
+
+# ---------- RUN ----------
+def run_load(app, users, mix, threads, seconds, warmup, seed):
+    weights = MIXES[mix]
+    names = list(weights)
+    recorders = []
+    start = threading.Barrier(threads + 1)
+    window = {}
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = app.test_client()
+        user = users[index % len(users)]
+        rec = Recorder()
+        start.wait()
+        while time.perf_counter() < window["end"]:
+            scenario = rng.choices(names, weights=[weights[n] for n in names])[0]
+            # Warm-up requests run but are not kept
+            target = rec if time.perf_counter() >= window["measure"] else Recorder()
+            SCENARIOS[scenario](target, client, user, rng)
+        recorders.append(rec)
+
+    workers = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(threads)]
+    for t in workers:
+        t.start()
+    now = time.perf_counter()
+    window["measure"] = now + warmup
+    window["end"] = now + warmup + seconds
+    start.wait()
+    for t in workers:
+        t.join()
+
+    merged = Recorder()
+    for rec in recorders:
+        merged.merge(rec)
+    return merged
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(routes, total):
+    print(f"{'route':<36} {'count':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, r in routes.items():
+        print(f"{route:<36} {r['count']:>7} {r['errors']:>5} {r['rps']:>8} "
+              f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+    print(f"{'TOTAL':<36} {total['requests']:>7} {total['errors']:>5} {total['rps']:>8}")
+
+
+# ---------- COMPARE ----------
+def _delta(old, new):
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old * 100:+6.1f}%"
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    print(f"{old_path} ({old['meta'].get('git')}) -> {new_path} ({new['meta'].get('git')})")
+    print(f"{'route':<36} {'rps':>16} {'p50':>16} {'p95':>16} {'p99':>16}")
+    for route in sorted(set(old["routes"]) | set(new["routes"])):
+        a, b = old["routes"].get(route), new["routes"].get(route)
+        if not a or not b:
+            print(f"{route:<36} {'only in ' + ('new' if b else 'old'):>16}")
+            continue
+        print(f"{route:<36} {b['rps']:>8} {_delta(a['rps'], b['rps'])}"
+              + "".join(f" {b[k]:>8} {_delta(a[k], b[k])}" for k in ("p50_ms", "p95_ms", "p99_ms")))
+    print(f"{'TOTAL rps':<36} {new['total']['rps']:>8} {_delta(old['total']['rps'], new['total']['rps'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="all")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--documents", type=int, default=3, help="documents seeded per user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongo-uri", help="database to run against (use a scratch database)")
+    parser.add_argument("--mongomock", action="store_true", help="in-memory MongoDB stand-in")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub LLM time to first chunk, seconds")
+    parser.add_argument("--llm-chunk-latency", type=float, default=0.02)
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<mix>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    app = build_app(args)
+    users = seed_users(app, args.users, args.documents)
+    recorder = run_load(app, users, args.mix, args.threads, args.seconds, args.warmup, args.seed)
+    routes, total = summarize(recorder, args.seconds)
+
+    result = {
+        "meta": {
+            "mix": args.mix,
+            "threads": args.threads,
+            "seconds": args.seconds,
+            "warmup": args.warmup,
+            "users": args.users,
+            "seed": args.seed,
+            "backend": "mongomock" if args.mongomock else "mongodb",
+            "llm_latency": args.llm_latency,
+            "llm_chunk_latency": args.llm_chunk_latency,
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "started": datetime.now().isoformat(timespec="seconds"),
+        },
+        "routes": routes,
+        "total": total,
+    }
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{args.mix}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print_table(routes, total)
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
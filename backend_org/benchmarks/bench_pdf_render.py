@@ -0,0 +1,63 @@
+"""Throughput of the PDF engines in pages per second.
+
+Run from backend_org/:
+
+    python -m benchmarks.bench_pdf_render --pages 5 --seconds 5
+"""
+import argparse
+import io
+import json
+import time
+
+from app.services.pdf_renderer import render_pdf
+
+CLAUSE = (
+    "The Receiving Party shall hold and maintain the Confidential Information in strict "
+    "confidence for the sole and exclusive benefit of the Disclosing Party, and shall not, "
+    "without prior written approval, use for its own benefit, publish, copy, or otherwise "
+    "disclose to others any Confidential Information."
+)
+
+
+def sample_agreement(paragraphs):
+    lines = ["NON-DISCLOSURE AGREEMENT (NDA)", ""]
+    for i in range(paragraphs):
+        lines += [f"{i + 1}. Clause {i + 1}", CLAUSE, ""]
+    return "\n".join(lines)
+
+
+def run(engine, text, seconds):
+    renders = pages = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        pages += render_pdf(text, io.BytesIO(), engine=engine)
+        renders += 1
+    elapsed = time.perf_counter() - started
+    return {
+        "engine": engine,
+        "renders": renders,
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 1),
+        "ms_per_render": round(elapsed / renders * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=5, help="approximate pages per document")
+    parser.add_argument("--seconds", type=float, default=5.0, help="time budget per engine")
+    args = parser.parse_args()
+
+    # ~9 clauses fill an A4 page at the default body size
+    text = sample_agreement(args.pages * 9)
+    results = [run(engine, text, args.seconds) for engine in ("platypus", "fast")]
+
+    for r in results:
+        print(f"{r['engine']:>9}: {r['pages_per_second']:>8} pages/s  "
+              f"({r['ms_per_render']} ms per {r['pages'] // r['renders']}-page render)")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@ from app import create_app
 import os
 os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
 
-app = create_app()
-
+# Only when run as a script: process pools (password hashing, PDF rendering)
+# spawn children that re-import this module, and each would otherwise build
+# its own app, Mongo client and event bus. `flask --app run` finds create_app.
 if __name__ == "__main__":
+    app = create_app()
     app.run(host="0.0.0.0", debug=True, use_reloader=False)
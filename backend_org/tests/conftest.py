@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+# Config reads the environment at import time, so set it before importing app
+os.environ.update({
+    "LLM_PROVIDER": "stub",
+    "JWT_SECRET_KEY": "test-jwt-secret-key-with-enough-bytes",
+    "FLASK_SECRET_KEY": "test-secret",
+    "GOOGLE_OAUTH_CLIENT_ID": "test",
+    "GOOGLE_OAUTH_CLIENT_SECRET": "test",
+    "MIGRATE_ON_STARTUP": "0",
+    "PASSWORD_HASH_WORKERS": "0",
+    "RESPONSE_CACHE_ENABLED": "0",
+    "PDF_PRERENDER_ENABLED": "0",
+    "JOB_QUEUE_BACKEND": "local",
+    "EVENT_BUS_BACKEND": "local",
+    "USER_CACHE_INVALIDATION": "local",
+})
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # Only app-level tests need a database; the rest run without mongomock
+    mongomock = pytest.importorskip("mongomock")
+    import app.extensions as ext
+    from app import create_app
+
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(ext, "MongoClient", lambda *args, **kwargs: client)
+    flask_app = create_app()
+    flask_app.config["TESTING"] = True
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/signup", json={
+        "username": "tester",
+        "email": "tester@example.com",
+        "password": "correct-horse",
+    })
+    assert response.status_code == 201
+    return {"Authorization": f"Bearer {response.get_json()['token']}"}
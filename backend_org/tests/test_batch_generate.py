@@ -0,0 +1,29 @@
+from app.services.document_service import generate_documents_batch
+
+COMMON = {
+    "companyName": "Leximate Ltd",
+    "disclosingParty": "Leximate Ltd",
+    "effectiveDate": "2026-01-01",
+    "purpose": "Evaluation of a potential business relationship",
+    "confidentialityLevel": "High",
+    "duration": "2 years",
+    "governingLaw": "England and Wales",
+    "additionalTerms": "None",
+}
+
+
+def test_results_follow_row_order_across_chunks(app):
+    rows = []
+    for i in range(7):
+        if i % 3 == 1:
+            rows.append("not an object")
+        elif i % 3 == 2:
+            rows.append({"companyName": ""})  # fails validation
+        else:
+            rows.append({"counterpartyName": f"Counterparty {i}", "receivingParty": f"Counterparty {i}"})
+
+    with app.app_context():
+        results = list(generate_documents_batch("user-1", "nda", rows, common=COMMON, batch_size=2))
+
+    assert [r["row"] for r in results] == list(range(7))
+    assert ["documentId" in r for r in results] == [i % 3 == 0 for i in range(7)]
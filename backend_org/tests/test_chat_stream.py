@@ -0,0 +1,98 @@
+import json
+import time
+
+import pytest
+
+from app.services.llm_service import init_llm
+
+FIRST_CHUNK_DELAY = 0.2
+CHUNK_DELAY = 0.05
+
+
+@pytest.fixture
+def slow_stub(app):
+    """Stub model that waits before its first chunk and between chunks."""
+    app.config.update(
+        LLM_PROVIDER="stub",
+        LLM_STUB_FIRST_CHUNK_DELAY=FIRST_CHUNK_DELAY,
+        LLM_STUB_CHUNK_DELAY=CHUNK_DELAY,
+    )
+    init_llm(app)
+
+
+@pytest.fixture
+def session_id(client, auth_headers):
+    return client.post("/startChat", headers=auth_headers).get_json()["session_id"]
+
+
+def read_events(response):
+    """Yield (event, data, seconds since the request) for each SSE frame."""
+    buffer = ""
+    for raw in response.response:
+        buffer += raw.decode("utf-8") if isinstance(raw, bytes) else raw
+        while "\n\n" in buffer:
+            frame, buffer = buffer.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+            if "event" in fields:
+                yield fields["event"], json.loads(fields["data"]), time.monotonic() - response.started
+
+
+def open_stream(client, auth_headers, session_id, message):
+    # The test client already pulls the first frame inside post()
+    started = time.monotonic()
+    response = client.post(
+        "/chat/stream",
+        json={"message": message, "session_id": session_id},
+        headers=auth_headers,
+        buffered=False,
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    response.started = started
+    return response
+
+
+def assistant_messages(client, auth_headers, session_id):
+    messages = client.get(f"/getMessages/{session_id}", headers=auth_headers).get_json()["messages"]
+    return [m["message"] for m in messages if m["sender"] == "assistant" and m["timestamp"]]
+
+
+def test_chunks_arrive_in_order_and_as_produced(client, auth_headers, session_id, slow_stub):
+    response = open_stream(client, auth_headers, session_id, "What is an NDA?")
+    events = list(read_events(response))
+    response.close()
+
+    names = [name for name, _, _ in events]
+    assert names[-1] == "done"
+    assert set(names[:-1]) == {"chunk"} and len(names) > 2
+
+    chunks = [data["text"] for name, data, _ in events if name == "chunk"]
+    reply = events[-1][1]["reply"]
+    assert "".join(chunks).strip() == reply
+    assert reply.startswith("[stub:")
+
+    # Streamed, not buffered: the first chunk waits for the model, later
+    # chunks follow one by one
+    times = [at for name, _, at in events if name == "chunk"]
+    assert times[0] >= FIRST_CHUNK_DELAY
+    assert times[-1] - times[0] >= CHUNK_DELAY * (len(times) - 1) * 0.9
+
+    assert assistant_messages(client, auth_headers, session_id) == [reply]
+
+
+def test_partial_reply_is_saved_when_client_disconnects(client, auth_headers, session_id, slow_stub):
+    response = open_stream(client, auth_headers, session_id, "Explain indemnity clauses")
+    events = read_events(response)
+    name, data, _ = next(events)
+    assert name == "chunk"
+
+    # Client goes away after the first chunk
+    response.close()
+
+    saved = assistant_messages(client, auth_headers, session_id)
+    assert saved == [data["text"].strip()]
+
+
+def test_missing_fields_are_rejected(client, auth_headers):
+    response = client.post("/chat/stream", json={"message": "hi"}, headers=auth_headers)
+    assert response.status_code == 400
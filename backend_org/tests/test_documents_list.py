@@ -0,0 +1,33 @@
+import pytest
+from flask_jwt_extended import decode_token
+
+from app.controllers.document_controller import DEFAULT_PAGE_SIZE
+from app.services.document_service import insert_document
+
+STATUSES = ["completed", "pending", "draft"]
+
+
+@pytest.fixture
+def documents(app, auth_headers):
+    with app.app_context():
+        user_id = decode_token(auth_headers["Authorization"].split()[1])["sub"]
+        for i in range(DEFAULT_PAGE_SIZE + 5):
+            insert_document({"user_id": user_id, "type": "nda", "status": STATUSES[i % 3]})
+    return DEFAULT_PAGE_SIZE + 5
+
+
+def test_list_is_capped_without_a_limit(client, auth_headers, documents):
+    first = client.get("/documents?shape=summary", headers=auth_headers).get_json()
+    assert len(first["documents"]) == DEFAULT_PAGE_SIZE
+    assert first["next_cursor"]
+
+    rest = client.get(f"/documents?shape=summary&after={first['next_cursor']}", headers=auth_headers).get_json()
+    assert len(rest["documents"]) == documents - DEFAULT_PAGE_SIZE
+    assert rest["next_cursor"] is None
+
+
+def test_stats_count_every_document(client, auth_headers, documents):
+    stats = client.get("/documents/stats", headers=auth_headers).get_json()["stats"]
+    assert stats["total"] == documents
+    assert sum(stats["byStatus"].values()) == documents
+    assert set(stats["byStatus"]) == set(STATUSES)
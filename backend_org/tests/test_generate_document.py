@@ -0,0 +1,35 @@
+from app.config.config import Config
+
+NDA = {
+    "documentType": "nda",
+    "companyName": "Leximate Ltd",
+    "counterpartyName": "Acme Corp",
+    "disclosingParty": "Leximate Ltd",
+    "receivingParty": "Acme Corp",
+    "effectiveDate": "2026-01-01",
+    "purpose": "Evaluation of a potential business relationship",
+    "confidentialityLevel": "High",
+    "duration": "2 years",
+    "governingLaw": "England and Wales",
+    "additionalTerms": "None",
+    "generateNow": True,
+}
+
+
+def test_local_backend_does_not_queue_jobs_by_default():
+    # conftest runs with JOB_QUEUE_BACKEND=local and no JOB_QUEUE_ENABLED
+    assert Config.JOB_QUEUE_BACKEND == "local"
+    assert Config.JOB_QUEUE_ENABLED is False
+
+
+def test_generation_completes_inline_without_a_shared_queue(client, auth_headers):
+    response = client.post("/generate-document", json=NDA, headers=auth_headers)
+    assert response.status_code == 200
+
+    data = response.get_json()
+    assert data["status"] == "completed"
+    assert "jobId" not in data
+    assert "Acme Corp" in data["documentText"]
+
+    saved = client.get(f"/documents/{data['documentId']}", headers=auth_headers).get_json()["document"]
+    assert saved["status"] == "completed"
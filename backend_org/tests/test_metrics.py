@@ -0,0 +1,34 @@
+import app.extensions as ext
+from app.services.response_cache import get_response_cache, init_response_cache
+
+TOKEN = "scrape-token"
+
+
+def test_metrics_are_closed_by_default(client):
+    assert client.get("/metrics").status_code == 401
+
+
+def test_metrics_need_the_token_when_one_is_set(app, client):
+    app.config["METRICS_TOKEN"] = TOKEN
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"}).status_code == 200
+
+
+def test_metrics_allow_listed_address(app, client):
+    app.config["METRICS_ALLOWED_IPS"] = ("10.0.0.5",)
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.9"}).status_code == 401
+    assert client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.5"}).status_code == 200
+
+
+def test_metrics_export_response_cache_counters(app, client):
+    app.config.update(RESPONSE_CACHE_ENABLED=True, RESPONSE_CACHE_SHARED=False, METRICS_TOKEN=TOKEN)
+    init_response_cache(app, ext.db)
+    cache = get_response_cache()
+    cache.put("What is an NDA?", "reply")
+    cache.get("What is an NDA?")
+    cache.get("What is a lease?")
+
+    body = client.get("/metrics", headers={"Authorization": f"Bearer {TOKEN}"}).get_data(as_text=True)
+    assert 'llm_response_cache_lookups_total{result="exact_hit"} 1' in body
+    assert 'llm_response_cache_lookups_total{result="miss"} 1' in body
+    assert "llm_response_cache_entries 1" in body
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.response_cache import ResponseCache
+
+# Pairs that look alike but ask different legal questions
+DIFFERENT_QUESTIONS = [
+    ("Can my employer terminate me without notice?", "Can my employee terminate me without notice?"),
+    ("Is a verbal contract legally binding?", "Is a verbal contract not legally binding?"),
+    ("Can I sue my landlord for the deposit?", "Can my landlord sue me for the deposit?"),
+    ("Is a 2 year non-compete enforceable?", "Is a 3 year non-compete enforceable?"),
+    ("Does the tenant pay for repairs?", "Doesn't the tenant pay for repairs?"),
+]
+
+
+@pytest.mark.parametrize("near_duplicates", [False, True])
+@pytest.mark.parametrize("cached, asked", DIFFERENT_QUESTIONS)
+def test_different_questions_never_share_a_reply(cached, asked, near_duplicates):
+    cache = ResponseCache(near_duplicates=near_duplicates)
+    cache.put(cached, "cached reply")
+    assert cache.get(asked) is None
+
+
+def test_exact_match_ignores_case_and_punctuation():
+    cache = ResponseCache()
+    cache.put("What is an NDA?", "reply")
+    assert cache.get("  what is an nda ") == "reply"
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_rewording_is_not_matched_by_default():
+    cache = ResponseCache()
+    cache.put("What is a non-disclosure agreement used for?", "reply")
+    assert cache.get("Please, what is a non-disclosure agreement used for?") is None
+
+
+def test_near_duplicate_tier_matches_harmless_rewording():
+    cache = ResponseCache(near_duplicates=True)
+    cache.put("What is a non-disclosure agreement used for?", "reply")
+    assert cache.get("Please, what is a non-disclosure agreement used for?") == "reply"
+    assert cache.stats()["near_hits"] == 1
@@ -29,6 +29,11 @@ type Doc = {
   raw: RawDoc;
 };
 
+type DocStats = {
+  total: number;
+  byStatus: Record<string, number>;
+};
+
 type Stat = {
   label: string;
   value: string;
@@ -62,6 +67,7 @@ const Dashboard: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
 
   const pollRef = useRef<number | null>(null);
+  const refreshTimerRef = useRef<number | null>(null);
   const navigate = useNavigate();
 
   const defaultQuickActions: QuickAction[] = [
@@ -81,12 +87,13 @@ const Dashboard: React.FC = () => {
     },
   ];
 
-  // Helper: compute stats from full docs array
-  const computeStatsFromRaw = (docs: RawDoc[]): Stat[] => {
-    const total = docs.length;
-    const pending = docs.filter((d) => String(d.status) === "pending").length;
-    const completed = docs.filter((d) => String(d.status) === "completed").length;
-    const drafts = docs.filter((d) => String(d.status) === "draft").length;
+  // Helper: build stat cards from the server-side counts
+  const computeStats = (counts: DocStats): Stat[] => {
+    const byStatus = counts.byStatus || {};
+    const total = counts.total || 0;
+    const pending = byStatus.pending || 0;
+    const completed = byStatus.completed || 0;
+    const drafts = byStatus.draft || 0;
 
     return [
       { label: "Contracts Created", value: String(total), icon: FileText, change: total ? `+${Math.min(50, Math.round(total / 5))}%` : "0%" },
@@ -96,19 +103,22 @@ const Dashboard: React.FC = () => {
     ];
   };
 
-  // Fetch / normalize documents, show only latest 3 in UI
+  // Fetch counts and the 3 most recent documents; neither needs the full list
   const fetchDocuments = async (): Promise<void> => {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get("/documents");
+      const [statsRes, res] = await Promise.all([
+        api.get("/documents/stats"),
+        api.get("/documents?shape=summary&limit=3"),
+      ]);
+      const statsData = statsRes as unknown as { data?: { stats?: DocStats } };
+      setStats(computeStats(statsData?.data?.stats || { total: 0, byStatus: {} }));
+
       // shape-safely read documents array
       const data = res as unknown as { data?: { documents?: RawDoc[] } };
       const docs: RawDoc[] = Array.isArray(data?.data?.documents) ? (data.data.documents as RawDoc[]) : [];
 
-      // Stats computed from full set (so we don't lose metrics)
-      setStats(computeStatsFromRaw(docs));
-
       // Normalize: set display 'name' to the document type FIRST (uppercase)
       const normalized: Doc[] = docs.map((d) => {
         const typeVal = d.type ? String(d.type) : (d.documentType ? String(d.documentType) : "");
@@ -165,9 +175,30 @@ const Dashboard: React.FC = () => {
 
   useEffect(() => {
     fetchDocuments();
-    // Poll every 10s to auto-update (no SSE provided by backend)
-    pollRef.current = window.setInterval(fetchDocuments, 10000) as unknown as number;
+
+    // Refresh when the backend pushes a document change over SSE
+    const token = localStorage.getItem("token");
+    const events = token
+      ? new EventSource(`${api.defaults.baseURL}/events?jwt=${encodeURIComponent(token)}`)
+      : null;
+    // A batch run emits one event per row; refetch once after the burst settles
+    const scheduleRefresh = () => {
+      if (refreshTimerRef.current) clearTimeout(refreshTimerRef.current);
+      refreshTimerRef.current = window.setTimeout(() => {
+        refreshTimerRef.current = null;
+        fetchDocuments();
+      }, 750) as unknown as number;
+    };
+    events?.addEventListener("document", scheduleRefresh);
+
+    // Slow safety-net poll in case the event stream is unavailable
+    pollRef.current = window.setInterval(fetchDocuments, 60000) as unknown as number;
     return () => {
+      events?.close();
+      if (refreshTimerRef.current) {
+        clearTimeout(refreshTimerRef.current);
+        refreshTimerRef.current = null;
+      }
       if (pollRef.current) {
         clearInterval(pollRef.current);
         pollRef.current = null;
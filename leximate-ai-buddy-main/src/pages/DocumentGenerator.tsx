@@ -16,6 +16,27 @@ interface GeneratedDocument {
   documentText: string;
 }
 
+interface JobStatus {
+  jobId: string;
+  status: "queued" | "running" | "completed" | "failed";
+  error?: string | null;
+  documentId?: string | null;
+}
+
+// Generation runs as a background job; poll until it settles
+const waitForJob = async (jobId: string, timeoutMs = 60000): Promise<JobStatus> => {
+  const started = Date.now();
+  let delay = 300;
+  while (Date.now() - started < timeoutMs) {
+    const res = await api.get<{ success: boolean; job: JobStatus }>(`/jobs/${jobId}`);
+    const job = res.data.job;
+    if (job.status === "completed" || job.status === "failed") return job;
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, 2000);
+  }
+  throw new Error("Timed out waiting for document generation");
+};
+
 const DocumentGenerator = () => {
   const [sidebarCollapsed, setSidebarCollapsed] = useState(false);
   const [currentStep, setCurrentStep] = useState(1);
@@ -133,16 +154,14 @@ useEffect(() => {
 
   const loadForEdit = async () => {
     try {
-      // GET /documents returns { success, documents }
-      const res = await api.get<{ success: boolean; documents: BackendDocument[] }>(
-        "/documents",
+      // GET /documents/:id returns { success, document }
+      const res = await api.get<{ success: boolean; document: BackendDocument }>(
+        `/documents/${documentId}`,
         { withCredentials: true }
       );
 
       if (res.data?.success) {
-        const docs: BackendDocument[] = res.data.documents;
-
-        const found = docs.find((doc) => String(doc._id) === documentId);
+        const found = res.data.document;
         if (!found) return;
 
         // Map backend fields → your formData
@@ -204,13 +223,25 @@ const generateDocument = async () => {
     };
 
     if (pendingDocId) payload.documentId = pendingDocId;
-    const response = await api.post<GeneratedDocument & { status?: string }>("/generate-document", payload);
+    const response = await api.post<GeneratedDocument & { status?: string; jobId?: string }>("/generate-document", payload);
 
     if (response.data.success) {
+      let documentText = response.data.documentText;
+      if (response.data.jobId) {
+        setPendingDocId(response.data.documentId || null);
+        const job = await waitForJob(response.data.jobId);
+        if (job.status === "failed") {
+          console.error("Generation job failed:", job.error);
+          alert("Failed to generate document.");
+          return;
+        }
+        const docRes = await api.get(`/documents/${response.data.documentId}`);
+        documentText = docRes.data.document?.generatedText ?? "";
+      }
       setGeneratedDoc({
         success: true,
         documentId: response.data.documentId,
-        documentText: response.data.documentText
+        documentText
       });
       setPendingDocId(response.data.documentId || null);
       alert("Document generated successfully!");
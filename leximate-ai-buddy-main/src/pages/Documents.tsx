@@ -30,6 +30,8 @@ import {
 } from "lucide-react";
 import { DropdownMenu, DropdownMenuContent, DropdownMenuItem, DropdownMenuTrigger } from "@/components/ui/dropdown-menu";
 
+const DOCUMENTS_PAGE_SIZE = 50;
+
 const Documents = () => {
   const [sidebarCollapsed, setSidebarCollapsed] = useState(false);
   const [viewMode, setViewMode] = useState("grid"); // "grid" or "table"
@@ -89,6 +91,7 @@ const [editForm, setEditForm] = useState({
   
 }
 const [documents, setDocuments] = useState<DocumentItem[]>([]);
+const [nextCursor, setNextCursor] = useState<string | null>(null);
 // Type returned by backend for each document
 type DocFromAPI = {
   _id: string;
@@ -109,16 +112,14 @@ type DocFromAPI = {
 // View handler: fetch documents endpoint and open modal with generatedText
 const handleViewDocument = async (docId: string): Promise<void> => {
   try {
-    // Fetch all documents (your backend returns documents list)
-    const res = await api.get<{ success: boolean; documents: DocFromAPI[] }>("/documents", { withCredentials: true });
+    const res = await api.get<{ success: boolean; document: DocFromAPI }>(`/documents/${docId}`, { withCredentials: true });
 
     if (!res.data || !res.data.success) {
       alert("Failed to fetch document for preview");
       return;
     }
 
-    const docs = res.data.documents || [];
-    const found = docs.find((d) => String(d._id) === docId);
+    const found = res.data.document;
 
     if (!found) {
       alert("Document not found");
@@ -279,11 +280,12 @@ const submitDocumentUpdate = async (): Promise<void> => {
 
 
   
-  useEffect(() => {
-  // Open preview modal for a document (fetch full document if needed)
-  const loadDocuments = async () => {
+  // One page of documents; "Load more" follows next_cursor for the rest
+  const loadDocuments = async (after: string | null = null) => {
     try {
-      const res = await api.get("/documents", { withCredentials: true });
+      const params = new URLSearchParams({ include: "generatedText", limit: String(DOCUMENTS_PAGE_SIZE) });
+      if (after) params.set("after", after);
+      const res = await api.get(`/documents?${params.toString()}`, { withCredentials: true });
       if (res.data.success) {
         
         const formatted = res.data.documents.map((doc: DocFromAPI) => {
@@ -334,14 +336,17 @@ const submitDocumentUpdate = async (): Promise<void> => {
 
 
 
-setDocuments(formatted);
+setDocuments(prev => (after ? [...prev, ...formatted] : formatted));
+setNextCursor(res.data.next_cursor || null);
       }
     } catch (e) {
       console.error("Failed to load docs:", e);
     }
   };
 
+  useEffect(() => {
   loadDocuments();
+  // eslint-disable-next-line react-hooks/exhaustive-deps
 }, []);
 
   const getStatusColor = (status: string) => {
@@ -632,6 +637,14 @@ setDocuments(formatted);
             </Card>
           )}
 
+          {nextCursor && (
+            <div className="mt-6 flex justify-center">
+              <Button variant="outline" onClick={() => loadDocuments(nextCursor)}>
+                Load more
+              </Button>
+            </div>
+          )}
+
           {/* Empty State */}
           {filteredDocuments.length === 0 && (
             <Card className="border-border shadow-soft">